@@ -2,73 +2,385 @@
 
 from association.Transaction import Transaction
 from association.Rule import Rule
+from association.RuleSet import RuleSet
+from association.TransactionStore import TransactionStore
+from association.VerticalCounter import VerticalCounter
+from association.TrieCounter import TrieCounter
+import contextlib
+import heapq
+import itertools
+import math
+import time
+import tracemalloc
 import pandas as pd
-from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+
+LIMIT_CHECK_CHUNK = 10_000  # candidates counted between two limit checks when no candidate_cap is set
 
 class Apriori:
-    def __init__(self, transactions: list[Transaction], min_support: float, min_confidence: float):
+    def __init__(self, transactions: list[Transaction] | TransactionStore, min_support: float,
+                 min_confidence: float, counting="vertical", itemset_mode="all", rule_workers=1, top_k=None,
+                 rank_by="lift", reduce_transactions=True, as_rule_set=False, max_len=None, time_budget=None,
+                 memory_limit_mb=None, candidate_cap=None):
+        # with a TransactionStore, itemsets are mined as item ids and only decoded in the rules
         self.transactions = transactions
         self.min_support = min_support
         self.min_confidence = min_confidence
+        if counting not in ("vertical", "trie", "scan"):
+            raise ValueError(f"Unknown counting method '{counting}'")
+        # 'vertical': tid bitsets, 'trie': one pass over the transactions per level through a candidate trie,
+        # 'scan': one pass over the transactions per candidate
+        self.counting = counting
+        self.reduce_transactions = reduce_transactions  # trie counting: trim and merge transactions between levels
+        if itemset_mode not in ("all", "closed", "maximal"):
+            raise ValueError(f"Unknown itemset mode '{itemset_mode}'")
+        # 'closed': no superset with the same support, 'maximal': no frequent superset;
+        # frequent_itemsets and the rules are then restricted to that condensed basis
+        self.itemset_mode = itemset_mode
+        self.rule_workers = rule_workers  # processes used to generate the rules of long itemsets
+        if rank_by not in ("lift", "confidence"):
+            raise ValueError(f"Unknown rule ranking '{rank_by}'")
+        # with top_k, run() returns only the top_k rules by rank_by, as a list in ranked order
+        self.top_k = top_k
+        self.rank_by = rank_by
+        self.as_rule_set = as_rule_set  # run() returns a columnar RuleSet instead of Rule objects
+        # limits of the search: itemset length, seconds and MB allocated (traced with tracemalloc) while
+        # mining, and again while generating rules. When one is hit the levels finished so far are kept (or
+        # the rules of the itemsets done so far), partial is set and stop_reason names the limit. With
+        # candidate_cap, levels are generated and counted in chunks of at most that many candidates; the
+        # time and memory limits are checked between chunks.
+        self.max_len = max_len
+        self.time_budget = time_budget
+        self.memory_limit_mb = memory_limit_mb
+        self.candidate_cap = candidate_cap
+        self.partial = False
+        self.stop_reason = None
+        self.counter = None
         self.rules = set()
         self.frequent_itemsets = []
+        self.candidate_counts = []  # number of candidates counted at each level
+        self.rows_per_level = []  # trie counting: distinct (weighted) transactions walked at each level
+        self.support_counts = {}  # frozenset -> transaction count, filled while mining the levels
 
     def run(self):
         self.frequent_itemsets = self._get_frequent_itemsets()
-        self.rules = self._generate_rules()
+        if self.stop_reason in ("time_budget", "memory_limit"):
+            self.frequent_itemsets = self._downward_closed(self.frequent_itemsets)
+        if self.itemset_mode != "all":
+            self.frequent_itemsets = self._condense(self.frequent_itemsets)
+        with self._limits(keep_partial=True):
+            if self.top_k:
+                self.rules = self._make_rules(self._top_k_rules(self.frequent_itemsets))
+            else:
+                self.rules = self._make_rules(self._generate_rules(self.frequent_itemsets))
         return self.rules
 
+    def _calculate_count(self, itemset):
+        if self.counter is not None:
+            return self.counter.count(itemset)
+        return sum(1 for items in self._item_rows() if itemset.issubset(items))
+
+    def _count_candidates(self, candidates):
+        if self.counter is not None:
+            return self.counter.count_candidates(candidates)
+        return [self._calculate_count(itemset) for itemset in candidates]
+
+    def _item_rows(self):
+        if isinstance(self.transactions, TransactionStore):
+            return self.transactions.rows()
+        return (t.items for t in self.transactions)
+
+    def _decode(self, itemset):
+        if isinstance(self.transactions, TransactionStore):
+            return self.transactions.decode(itemset)
+        return itemset
+
     def _calculate_support(self, itemset):
-        count = sum(1 for t in self.transactions if itemset.issubset(t.items))
+        return self._calculate_count(itemset) / len(self.transactions)
+
+    def _min_count(self):
+        # smallest transaction count c with c / n >= min_support, so integer tests match the float test above
+        n = len(self.transactions)
+        min_count = max(math.ceil(self.min_support * n), 0)
+        while min_count > 0 and (min_count - 1) / n >= self.min_support:
+            min_count -= 1
+        while min_count <= n and min_count / n < self.min_support:
+            min_count += 1
+        return min_count
+
+    def _support(self, itemset):
+        # every subset of a frequent itemset is frequent, so rule generation only misses the table
+        # when a miner streams its itemsets instead of keeping them
+        count = self.support_counts.get(itemset)
+        if count is None:
+            count = self._calculate_count(itemset)
         return count / len(self.transactions)
 
+    def itemset_supports(self):
+        # the frequent itemsets of the last run in the caller's items, with their support
+        return {self._decode(itemset): self._support(itemset) for itemset in self.frequent_itemsets}
+
     def _get_frequent_itemsets(self):
         all_frequent = []
+        self.candidate_counts = []
+        self.rows_per_level = []
+        self.support_counts = {}
+        if self.counting == "vertical":
+            self.counter = VerticalCounter(self.transactions)
+        elif self.counting == "trie":
+            self.counter = TrieCounter(self.transactions, reduce=self.reduce_transactions)
         itemsets = set()
 
         # Generate 1-itemsets
-        for t in self.transactions:
-            itemsets.update(t.items)
-        L1 = [{i} for i in itemsets]
-
-        k = 1
-        current_L = L1
-        while current_L:
-            valid_L = []
-            seen = set()
-            for itemset in current_L:
-                frozen = frozenset(itemset)
-                if frozen in seen:
-                    continue
-                support = self._calculate_support(frozen)
-                if support >= self.min_support:
-                    valid_L.append(frozen)
-                    seen.add(frozen)
-
-            if not valid_L:
-                break
-            all_frequent.extend(valid_L)
+        for items in self._item_rows():
+            itemsets.update(items)
+        current_L = [frozenset([i]) for i in itemsets]
 
-            # Generate candidates of length k+1
-            current_L = [a.union(b) for a in valid_L for b in valid_L if len(a.union(b)) == k + 1]
-            k += 1
+        with self._limits():
+            k = 1
+            while True:
+                valid_L = []
+                nb_candidates = 0
+                for chunk in self._candidate_chunks(current_L):
+                    if self._limit_reached():
+                        # the unfinished level is dropped, the levels before it are complete
+                        return all_frequent
+                    nb_candidates += len(chunk)
+                    for itemset, count in zip(chunk, self._count_candidates(chunk)):
+                        if count / len(self.transactions) >= self.min_support:
+                            valid_L.append(itemset)
+                            self.support_counts[itemset] = count
+                if not nb_candidates:
+                    break
+                self.candidate_counts.append(nb_candidates)
+                if self.counting == "trie":
+                    self.rows_per_level.append(len(self.counter.rows))
+                    self.counter.reduce(valid_L)
+
+                if not valid_L:
+                    break
+                all_frequent.extend(valid_L)
+
+                # Generate candidates of length k+1, lazily so a capped level is never held whole
+                current_L = self.iter_apriori_gen(valid_L)
+                if self.max_len is not None and k == self.max_len:
+                    if next(current_L, None) is not None:
+                        self.partial, self.stop_reason = True, "max_len"
+                    break
+                k += 1
 
         return all_frequent
 
-    def _generate_rules(self):
-        rules = set()
-        for itemset in self.frequent_itemsets:
+    def _candidate_chunks(self, candidates):
+        # a whole level at once, or slices of at most candidate_cap candidates counted one after another;
+        # a time or memory limit alone also slices the level, so it is checked while a big level is counted
+        chunk_size = self.candidate_cap
+        if chunk_size is None and (self.time_budget is not None or self.memory_limit_mb is not None):
+            chunk_size = LIMIT_CHECK_CHUNK
+        if chunk_size is None:
+            yield list(candidates)
+            return
+        candidates = iter(candidates)
+        while True:
+            chunk = list(itertools.islice(candidates, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    @contextlib.contextmanager
+    def _limits(self, keep_partial=False):
+        # clock and memory tracing for _limit_reached() over one mining run, or with keep_partial over the
+        # rule generation after it, which keeps a limit the mining hit on record
+        if not keep_partial:
+            self.partial, self.stop_reason = False, None
+        self._stopped = False
+        self._started = time.perf_counter()
+        tracing = self.memory_limit_mb is not None and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        try:
+            yield
+        finally:
+            if tracing:
+                tracemalloc.stop()
+
+    def _limit_reached(self):
+        # a time or memory limit stays reached once hit, so depth-first searches unwind at every level
+        if self._stopped:
+            return True
+        if self.time_budget is not None and time.perf_counter() - self._started > self.time_budget:
+            self.stop_reason = "time_budget"
+        elif self.memory_limit_mb is not None and tracemalloc.get_traced_memory()[0] > self.memory_limit_mb * 2 ** 20:
+            self.stop_reason = "memory_limit"
+        else:
+            return False
+        self.partial = self._stopped = True
+        return True
+
+    def _downward_closed(self, itemsets):
+        # a depth-first search stopped by a limit can hold an itemset without some of its subsets; keeping
+        # only itemsets whose subsets were all found lets condensing and rule generation read support_counts
+        kept = set()
+        for itemset in sorted(itemsets, key=len):
+            if len(itemset) == 1 or all(itemset - {item} in kept for item in itemset):
+                kept.add(itemset)
+        self.support_counts = {itemset: count for itemset, count in self.support_counts.items() if itemset in kept}
+        return [itemset for itemset in itemsets if itemset in kept]
+
+    def _condense(self, itemsets):
+        # an itemset is closed / maximal unless an immediate superset has the same support / is frequent,
+        # so one pass marking the (k-1)-subsets of every frequent k-itemset is enough
+        covered = set()
+        for itemset in itemsets:
+            if len(itemset) < 2:
+                continue
+            count = self.support_counts[itemset]
+            for item in itemset:
+                subset = itemset - {item}
+                if self.itemset_mode == "maximal" or self.support_counts[subset] == count:
+                    covered.add(subset)
+        return [itemset for itemset in itemsets if itemset not in covered]
+
+    @staticmethod
+    def apriori_gen(frequent_k):
+        return list(Apriori.iter_apriori_gen(frequent_k))
+
+    @staticmethod
+    def iter_apriori_gen(frequent_k):
+        # join: two sorted k-itemsets sharing their first k-1 items give one (k+1)-candidate
+        # prune: drop candidates with an infrequent k-subset (downward closure)
+        frequent = set(frequent_k)
+        sorted_L = sorted(tuple(sorted(itemset)) for itemset in frequent_k)
+        for i, a in enumerate(sorted_L):
+            for b in sorted_L[i + 1:]:
+                if a[:-1] != b[:-1]:
+                    break  # itemsets sharing a prefix are contiguous once sorted
+                candidate = a + (b[-1],)
+                # the subsets without the last two items are a and b themselves
+                if all(frozenset(candidate[:j] + candidate[j + 1:]) in frequent for j in range(len(candidate) - 2)):
+                    yield frozenset(candidate)
+
+    def _generate_rules(self, itemsets):
+        # (antecedent, consequent, support, confidence, lift) of every rule, itemsets still encoded
+        if self.rule_workers > 1:
+            # the rule count of an itemset grows exponentially with its length: fan the long ones out
+            itemsets = list(itemsets)
+            large = [itemset for itemset in itemsets if len(itemset) >= 3]
+            itemsets = [itemset for itemset in itemsets if len(itemset) < 3]
+            if large:
+                yield from self._parallel_rules(large)
+        for itemset in itemsets:
+            if self._limit_reached():
+                return
+            yield from self.ap_genrules(itemset, self._support, self.min_confidence)
+
+    def _parallel_rules(self, itemsets):
+        chunks = [itemsets[i::self.rule_workers * 4] for i in range(self.rule_workers * 4)]
+        # the workers stop at the same wall-clock deadline, the memory limit is checked here between chunks
+        deadline = None
+        if self.time_budget is not None:
+            deadline = time.time() + self.time_budget - (time.perf_counter() - self._started)
+        with ProcessPoolExecutor(max_workers=self.rule_workers, initializer=_init_rule_worker,
+                                 initargs=(self.support_counts, len(self.transactions), self.min_confidence,
+                                           deadline)) as pool:
+            missing = []
+            for chunk_rules, chunk_missing, timed_out in pool.map(_rules_of_chunk, chunks):
+                yield from chunk_rules
+                missing.extend(chunk_missing)
+                if timed_out and not self._stopped:
+                    self.partial = self._stopped = True
+                    self.stop_reason = "time_budget"
+                if self._limit_reached():
+                    pool.shutdown(wait=False, cancel_futures=True)  # chunks not started yet are dropped
+                    return
+        # itemsets with a subset the shipped table lacks: their supports are counted here
+        for itemset in missing:
+            if self._limit_reached():
+                return
+            yield from self.ap_genrules(itemset, self._support, self.min_confidence)
+
+    def _make_rules(self, rules):
+        # a set of Rule objects (a ranked list with top_k), or a RuleSet sharing the store's vocabulary
+        if self.as_rule_set:
+            vocabulary = self.transactions.vocabulary if isinstance(self.transactions, TransactionStore) else None
+            return RuleSet.from_tuples(rules, vocabulary)
+        rules = [Rule(self._decode(antecedent), self._decode(consequent), sup, conf, lift)
+                 for antecedent, consequent, sup, conf, lift in rules]
+        return rules if self.top_k else set(rules)
+
+    def _top_k_rules(self, itemsets):
+        # bounded min-heap of the best top_k rules so far; once it is full its minimum is a bar every
+        # new rule has to beat, which raises the confidence threshold or skips whole itemsets for lift
+        heap = []
+        min_confidence = self.min_confidence
+        seq = 0  # tie breaker, keeps the heap from ever comparing itemsets
+        for itemset in itemsets:
+            if self._limit_reached():
+                break
             if len(itemset) < 2:
                 continue
-            for i in range(1, len(itemset)):
-                for antecedent in combinations(itemset, i):
-                    antecedent = frozenset(antecedent)
-                    consequent = itemset - antecedent
-                    if not consequent:
+            # lift(X -> Y) = sup(XY) / (sup(X) * sup(Y)) <= 1 / sup(XY)
+            if self.rank_by == "lift" and len(heap) == self.top_k and 1 / self._support(itemset) <= heap[0][0]:
+                continue
+            for antecedent, consequent, sup, conf, lift in self.ap_genrules(itemset, self._support, min_confidence):
+                score = lift if self.rank_by == "lift" else conf
+                if len(heap) == self.top_k:
+                    if score <= heap[0][0]:
                         continue
-                    sup = self._calculate_support(itemset)
-                    conf = sup / self._calculate_support(antecedent)
-                    lift = conf / self._calculate_support(consequent)
-                    if conf >= self.min_confidence:
-                        rules.add(Rule(antecedent, consequent, sup, conf, lift))
-        return rules
+                    heapq.heappop(heap)
+                seq += 1
+                heapq.heappush(heap, (score, -seq, antecedent, consequent, sup, conf, lift))
+                if len(heap) == self.top_k and self.rank_by == "confidence":
+                    min_confidence = max(min_confidence, heap[0][0])
+
+        return [rule[2:] for rule in sorted(heap, reverse=True)]
+
+    @staticmethod
+    def ap_genrules(itemset, support, min_confidence):
+        # consequents grow level by level; confidence only drops when items move from the antecedent
+        # to the consequent, so supersets of a consequent that failed min_confidence are never tried
+        if len(itemset) < 2:
+            return
+        sup = support(itemset)
+        consequents = [frozenset([item]) for item in itemset]
+        while consequents and len(consequents[0]) < len(itemset):
+            passed = []
+            for consequent in consequents:
+                antecedent = itemset - consequent
+                conf = sup / support(antecedent)
+                if conf >= min_confidence:
+                    passed.append(consequent)
+                    yield antecedent, consequent, sup, conf, conf / support(consequent)
+            consequents = Apriori.apriori_gen(passed)
+
+
+_worker_support_counts = {}
+_worker_n_transactions = 0
+_worker_min_confidence = 0.0
+_worker_deadline = None
+
+
+def _init_rule_worker(support_counts, n_transactions, min_confidence, deadline):
+    # the support table is shipped once per worker process instead of once per task
+    global _worker_support_counts, _worker_n_transactions, _worker_min_confidence, _worker_deadline
+    _worker_support_counts = support_counts
+    _worker_n_transactions = n_transactions
+    _worker_min_confidence = min_confidence
+    _worker_deadline = deadline
+
+
+def _rules_of_chunk(itemsets):
+    # (rules, itemsets left to the parent process because a subset is missing from the support table,
+    # whether the time budget ran out before the end of the chunk)
+    def support(itemset):
+        return _worker_support_counts[itemset] / _worker_n_transactions
+
+    rules, missing = [], []
+    for itemset in itemsets:
+        if _worker_deadline is not None and time.time() > _worker_deadline:
+            return rules, missing, True
+        try:
+            rules.extend(list(Apriori.ap_genrules(itemset, support, _worker_min_confidence)))
+        except KeyError:
+            missing.append(itemset)
+    return rules, missing, False
@@ -0,0 +1,87 @@
+# association/Eclat.py
+
+from association.Transaction import Transaction
+from association.TransactionStore import TransactionStore
+from association.Apriori import Apriori
+from association.VerticalCounter import VerticalCounter
+
+
+class Eclat(Apriori):
+    # depth-first miner over the vertical layout: each itemset carries its tidset (int bitset),
+    # or with use_diffsets (dEclat) the tids its prefix has but it lacks, which shrink as itemsets grow
+    def __init__(self, transactions: list[Transaction] | TransactionStore, min_support: float,
+                 min_confidence: float, use_diffsets=False, low_memory=False, **kwargs):
+        super().__init__(transactions, min_support, min_confidence, **kwargs)
+        if low_memory and self.itemset_mode != "all":
+            raise ValueError("low_memory streams every itemset, it cannot be combined with closed/maximal modes")
+        if low_memory and self.rule_workers > 1:
+            raise ValueError("low_memory streams every itemset, it cannot be combined with rule_workers > 1")
+        self.use_diffsets = use_diffsets
+        self.low_memory = low_memory  # stream itemsets into rule generation, keep no itemset/support tables
+
+    def run(self):
+        if not self.low_memory:
+            return super().run()
+
+        self.frequent_itemsets = []
+        self.support_counts = {}
+        # supports of the sub-itemsets are recounted from the bitsets on demand
+        itemsets = (itemset for itemset, _ in self.iter_frequent_itemsets())
+        # mining and rule generation are interleaved here, so they share one time and memory budget
+        with self._limits():
+            if self.top_k:
+                self.rules = self._make_rules(self._top_k_rules(itemsets))
+            else:
+                self.rules = self._make_rules(self._generate_rules(itemsets))
+        return self.rules
+
+    def _get_frequent_itemsets(self):
+        self.support_counts = {}
+        self.candidate_counts = []
+        for itemset, count in self.iter_frequent_itemsets():
+            self.support_counts[itemset] = count
+        return list(self.support_counts)
+
+    def iter_frequent_itemsets(self):
+        # generator of (frozenset, count); only the current search path is held in memory
+        self.counter = VerticalCounter(self.transactions)
+        if not len(self.transactions):
+            return  # like Apriori, no transactions give no itemsets
+        min_count = self._min_count()
+        atoms = []
+        for item in sorted(self.counter.bitsets):
+            tids = self.counter.bitsets[item]
+            count = tids.bit_count()
+            if count >= min_count:
+                atoms.append((frozenset([item]), tids, count))
+        with self._limits():
+            yield from self._search(atoms, min_count, diffsets=False)
+
+    def _search(self, atoms, min_count, diffsets):
+        for i, (itemset_a, set_a, count_a) in enumerate(atoms):
+            if self._limit_reached():
+                return
+            yield itemset_a, count_a
+
+            children = []
+            for itemset_b, set_b, count_b in atoms[i + 1:]:
+                if diffsets:
+                    # d(PAB) = d(PB) - d(PA)
+                    child = set_b & ~set_a
+                    count = count_a - child.bit_count()
+                elif self.use_diffsets:
+                    # switch from tidsets to diffsets: d(AB) = t(A) - t(B)
+                    child = set_a & ~set_b
+                    count = count_a - child.bit_count()
+                else:
+                    child = set_a & set_b
+                    count = child.bit_count()
+                if count >= min_count:
+                    children.append((itemset_a | itemset_b, child, count))
+                    if self.max_len is not None and len(itemset_a) == self.max_len:
+                        self.partial, self.stop_reason = True, "max_len"
+                        children = []
+                        break
+
+            if children:
+                yield from self._search(children, min_count, diffsets or self.use_diffsets)
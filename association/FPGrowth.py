@@ -0,0 +1,103 @@
+# association/FPGrowth.py
+
+from association.Transaction import Transaction
+from association.TransactionStore import TransactionStore
+from association.Apriori import Apriori
+
+
+class FPNode:
+    __slots__ = ("item", "count", "parent", "children")
+
+    def __init__(self, item, parent):
+        self.item = item
+        self.count = 0
+        self.parent = parent
+        self.children = {}
+
+
+class FPGrowth(Apriori):
+    # same inputs and Rule output as Apriori, but frequent itemsets are mined from an FP-tree
+    # (no candidate generation); rule generation is inherited and reads self.support_counts
+    def __init__(self, transactions: list[Transaction] | TransactionStore, min_support: float,
+                 min_confidence: float, **kwargs):
+        # kwargs: the rule / output options of Apriori (itemset_mode, rule_workers, top_k, ...)
+        super().__init__(transactions, min_support, min_confidence, **kwargs)
+
+    def _get_frequent_itemsets(self):
+        self.support_counts = {}
+        self.candidate_counts = []
+        if not len(self.transactions):
+            return []  # like Apriori, no transactions give no itemsets
+        min_count = self._min_count()
+
+        item_counts = {}
+        for items in self._item_rows():
+            for item in items:
+                item_counts[item] = item_counts.get(item, 0) + 1
+
+        # global order: most frequent first, so transactions share the longest possible prefixes
+        ordered = sorted((i for i, c in item_counts.items() if c >= min_count), key=lambda i: (-item_counts[i], i))
+        rank = {item: r for r, item in enumerate(ordered)}
+
+        paths = []
+        for items in self._item_rows():
+            path = sorted((item for item in items if item in rank), key=rank.__getitem__)
+            if path:
+                paths.append((path, 1))
+
+        with self._limits():
+            self._mine(paths, frozenset(), rank, min_count)
+        return list(self.support_counts)
+
+    def _mine(self, paths, suffix, rank, min_count):
+        # depth first: a limit stops the search where it is, the itemsets found so far keep exact counts
+        if self._limit_reached():
+            return
+        counts = {}
+        for path, count in paths:
+            for item in path:
+                counts[item] = counts.get(item, 0) + count
+        frequent = {item for item, count in counts.items() if count >= min_count}
+        if not frequent:
+            return
+        if self.max_len is not None and len(suffix) == self.max_len:
+            self.partial, self.stop_reason = True, "max_len"
+            return
+
+        root, header = self._build_tree(paths, frequent)
+
+        # least frequent items first: their conditional pattern bases are the smallest
+        for item in sorted(frequent, key=rank.__getitem__, reverse=True):
+            itemset = suffix | {item}
+            self.support_counts[itemset] = counts[item]
+
+            conditional = []
+            for node in header[item]:
+                prefix = []
+                parent = node.parent
+                while parent is not root:
+                    prefix.append(parent.item)
+                    parent = parent.parent
+                if prefix:
+                    prefix.reverse()
+                    conditional.append((prefix, node.count))
+            if conditional:
+                self._mine(conditional, itemset, rank, min_count)
+
+    @staticmethod
+    def _build_tree(paths, frequent):
+        root = FPNode(None, None)
+        header = {item: [] for item in frequent}  # item -> every tree node holding it
+        for path, count in paths:
+            node = root
+            for item in path:
+                if item not in frequent:
+                    continue
+                child = node.children.get(item)
+                if child is None:
+                    child = FPNode(item, node)
+                    node.children[item] = child
+                    header[item].append(child)
+                child.count += count
+                node = child
+        return root, header
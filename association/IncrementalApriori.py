@@ -0,0 +1,127 @@
+# association/IncrementalApriori.py
+
+import pickle
+from association.Transaction import Transaction
+from association.TransactionStore import TransactionStore
+from association.Apriori import Apriori
+from association.VerticalCounter import VerticalCounter
+
+
+class IncrementalApriori(Apriori):
+    # FUP: when a batch of transactions is appended, itemsets frequent in the old data only need
+    # their batch counts added, and an itemset infrequent in the old data can only become frequent
+    # if it is frequent in the batch itself, so the old data is only scanned for those few itemsets
+    def __init__(self, transactions: list[Transaction] | TransactionStore, min_support: float,
+                 min_confidence: float, **kwargs):
+        if not isinstance(transactions, TransactionStore):
+            transactions = TransactionStore.from_transactions(transactions)
+        super().__init__(transactions, min_support, min_confidence, **kwargs)
+        self.n_mined = 0  # transactions covered by support_counts
+        self.mined_stop_reason = None  # limit that cut the mining of support_counts short, not the rules
+        self.update_stats = {}
+
+    def update(self, new_transactions: list[Transaction] | TransactionStore):
+        # FUP adds batch counts to complete levels: a state cut short by a time or memory limit lacks
+        # itemsets the update would never look for
+        if self.n_mined and self.mined_stop_reason in ("time_budget", "memory_limit"):
+            raise ValueError(f"The mining state is partial ({self.mined_stop_reason}), "
+                             f"mine the full data again instead of updating it")
+        self.transactions.extend(t.items for t in new_transactions)
+        return self.run()
+
+    def _get_frequent_itemsets(self):
+        if self.n_mined == 0:
+            frequent = super()._get_frequent_itemsets()
+        else:
+            frequent = self._fup_update()
+        self.n_mined = len(self.transactions)
+        self.mined_stop_reason = self.stop_reason
+        return frequent
+
+    def _fup_update(self):
+        n_old, n_total = self.n_mined, len(self.transactions)
+        n_new = n_total - n_old
+        if n_new == 0:
+            self.partial, self.stop_reason = self.mined_stop_reason is not None, self.mined_stop_reason
+            return list(self.support_counts)
+        with self._limits():
+            return self._fup_levels(n_old, n_total, n_new)
+
+    def _fup_levels(self, n_old, n_total, n_new):
+        old_counts = self.support_counts
+        batch = VerticalCounter(self.transactions.slice(n_old, n_total))
+        old_data = None  # counter over the old transactions, only built if a promotion needs it
+        self.counter = None
+        self.support_counts = {}
+        self.candidate_counts = []
+        stats = {"kept": 0, "promoted": 0, "demoted": 0, "old_data_scans": 0}
+
+        all_frequent = []
+        current_L = [frozenset([i]) for i in range(self.transactions.nb_items)]
+        k = 1
+        while current_L:
+            if self._limit_reached():
+                break  # the unfinished level is dropped, the levels before it are complete
+            self.candidate_counts.append(len(current_L))
+            valid_L = []
+            pending = []  # infrequent in the old data but frequent in the batch: need their old counts
+            for itemset in current_L:
+                new_count = batch.count(itemset)
+                if itemset in old_counts:
+                    count = old_counts[itemset] + new_count
+                    if count / n_total >= self.min_support:
+                        valid_L.append(itemset)
+                        self.support_counts[itemset] = count
+                        stats["kept"] += 1
+                elif new_count / n_new >= self.min_support:
+                    pending.append((itemset, new_count))
+
+            if pending and old_data is None:
+                old_data = VerticalCounter(self.transactions.slice(0, n_old))
+            for itemset, new_count in pending:
+                stats["old_data_scans"] += 1
+                count = old_data.count(itemset) + new_count
+                if count / n_total >= self.min_support:
+                    valid_L.append(itemset)
+                    self.support_counts[itemset] = count
+                    stats["promoted"] += 1
+
+            if not valid_L:
+                break
+            all_frequent.extend(valid_L)
+            current_L = self.apriori_gen(valid_L)
+            if self.max_len is not None and k == self.max_len:
+                if current_L:
+                    self.partial, self.stop_reason = True, "max_len"
+                break
+            k += 1
+
+        stats["demoted"] = sum(1 for itemset in old_counts if itemset not in self.support_counts)
+        self.update_stats = stats
+        return all_frequent
+
+    def save_state(self, path):
+        state = {
+            "transactions": self.transactions,
+            "support_counts": self.support_counts,
+            "n_mined": self.n_mined,
+            "stop_reason": self.mined_stop_reason,
+            "max_len": self.max_len,
+            "min_support": self.min_support,
+            "min_confidence": self.min_confidence,
+        }
+        with open(path, "wb") as f:
+            pickle.dump(state, f)
+
+    @classmethod
+    def load_state(cls, path, **kwargs):
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        model = cls(state["transactions"], state["min_support"], state["min_confidence"], **kwargs)
+        model.support_counts = state["support_counts"]
+        model.n_mined = state["n_mined"]
+        model.stop_reason = model.mined_stop_reason = state.get("stop_reason")
+        model.partial = model.stop_reason is not None
+        if model.stop_reason == "max_len" and (model.max_len is None or model.max_len > state["max_len"]):
+            raise ValueError(f"The saved state only holds itemsets up to length {state['max_len']}")
+        return model
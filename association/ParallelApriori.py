@@ -0,0 +1,103 @@
+# association/ParallelApriori.py
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from association.Transaction import Transaction
+from association.TransactionStore import TransactionStore
+from association.Apriori import Apriori
+from association.VerticalCounter import VerticalCounter
+
+
+def _mine_partition(store, min_support, limits):
+    # pass 1 (runs in a worker): frequent itemsets of one partition at the same relative support, and the
+    # limit that cut the partition short if any; a partial partition still holds complete levels
+    miner = Apriori(store, min_support, 1.0, **limits)
+    return miner._get_frequent_itemsets(), miner.stop_reason
+
+
+def _count_partition(store, candidates):
+    # pass 2 (runs in a worker): exact counts of every global candidate in one partition
+    counter = VerticalCounter(store)
+    return [counter.count(itemset) for itemset in candidates]
+
+
+class ParallelApriori(Apriori):
+    # SON algorithm: an itemset frequent in the whole data is frequent in at least one partition,
+    # so the union of the partitions' frequent itemsets is a complete candidate set for one global count
+    # Limits apply to each partition's miner with the run's deadline; a partition stopped by a time or memory
+    # limit still holds its finished levels, so the levels every partition finished are counted globally
+    # and returned exactly, as a partial result
+    def __init__(self, transactions: list[Transaction] | TransactionStore, min_support: float,
+                 min_confidence: float, n_workers=None, n_partitions=None, **kwargs):
+        n_workers = n_workers or os.cpu_count() or 1
+        kwargs.setdefault("rule_workers", n_workers)
+        super().__init__(transactions, min_support, min_confidence, **kwargs)
+        self.n_workers = n_workers
+        self.n_partitions = n_partitions or self.n_workers
+
+    def _get_frequent_itemsets(self):
+        self.support_counts = {}
+        self.candidate_counts = []
+        if not len(self.transactions):
+            return []  # like Apriori, no transactions give no itemsets
+        # partitions are CSR slices, cheap to pickle and counted with the numpy bitset builder
+        if isinstance(self.transactions, TransactionStore):
+            store = self.transactions
+        else:
+            store = TransactionStore.from_transactions(self.transactions)
+        size = -(-len(store) // self.n_partitions)  # ceil
+        partitions = [store.slice(i, i + size) for i in range(0, len(store), size)]
+        # a hair below min_support so float rounding of count / n can never drop a locally frequent itemset
+        local_support = self.min_support * (1 - 1e-9)
+
+        with self._limits():
+            if self.n_workers == 1:
+                local = [_mine_partition(p, local_support, self._partition_limits()) for p in partitions]
+                candidates = self._candidates(local)
+                partial_counts = [_count_partition(p, candidates) for p in partitions]
+            else:
+                with ProcessPoolExecutor(max_workers=self.n_workers) as pool:
+                    local = list(pool.map(_mine_partition, partitions, [local_support] * len(partitions),
+                                          [self._partition_limits()] * len(partitions)))
+                    candidates = self._candidates(local)
+                    partial_counts = list(pool.map(_count_partition, partitions, [candidates] * len(partitions)))
+
+        self.candidate_counts = [0] * max((len(c) for c in candidates), default=0)
+        for itemset in candidates:
+            self.candidate_counts[len(itemset) - 1] += 1
+
+        all_frequent = []
+        for itemset, count in zip(candidates, map(sum, zip(*partial_counts))):
+            if count / len(self.transactions) >= self.min_support:
+                if store is not self.transactions:
+                    itemset = store.decode(itemset)  # back to the caller's items
+                self.support_counts[itemset] = count
+                all_frequent.append(itemset)
+
+        # same test as Apriori: max_len cut the search if the longest level still generates a candidate
+        if self.max_len is not None and not self.partial:
+            longest = [itemset for itemset in all_frequent if len(itemset) == self.max_len]
+            if next(self.iter_apriori_gen(longest), None) is not None:
+                self.partial, self.stop_reason = True, "max_len"
+        return all_frequent
+
+    def _partition_limits(self):
+        # every partition stops at the same deadline as the whole run
+        time_budget = None
+        if self.time_budget is not None:
+            time_budget = max(self.time_budget - (time.perf_counter() - self._started), 0.0)
+        return {"max_len": self.max_len, "time_budget": time_budget, "memory_limit_mb": self.memory_limit_mb,
+                "candidate_cap": self.candidate_cap}
+
+    def _candidates(self, local):
+        # union of the partitions' itemsets; a time or memory limit in one partition makes the run partial
+        # and cuts the candidates to the levels that partition finished (its longest itemsets)
+        depth = None
+        for itemsets, stop_reason in local:
+            if stop_reason in ("time_budget", "memory_limit"):
+                self.partial, self.stop_reason = True, stop_reason
+                finished = max(map(len, itemsets), default=0)
+                depth = finished if depth is None else min(depth, finished)
+        candidates = set().union(*(itemsets for itemsets, _ in local))
+        return [itemset for itemset in candidates if depth is None or len(itemset) <= depth]
@@ -0,0 +1,98 @@
+# association/ResultStore.py
+
+import json
+import os
+import numpy as np
+from association.RuleSet import RuleSet
+
+
+class ResultStore:
+    # mined itemsets and rules in columnar form: the rules as a RuleSet, and the itemsets as CSR item ids
+    # over the same vocabulary (itemset_items[itemset_offsets[i]:itemset_offsets[i + 1]]) with their support.
+    # On disk each column is its own .npy file, so load(mmap=True) maps them instead of parsing anything
+    # and a rule is only decoded when it is read.
+    FORMAT_VERSION = 1
+    ITEMSET_COLUMNS = ("itemset_offsets", "itemset_items", "itemset_support")
+    RULE_COLUMNS = ("antecedent_offsets", "antecedent_items", "consequent_offsets", "consequent_items",
+                    "support", "confidence", "lift")
+
+    def __init__(self, rule_set, itemset_columns):
+        self.rule_set = rule_set
+        self.vocabulary = rule_set.vocabulary  # item id -> item, shared by rules and itemsets
+        self.itemset_columns = itemset_columns  # column name -> numpy array
+
+    @classmethod
+    def from_results(cls, rules, itemsets=None):
+        # rules: a RuleSet or Rule objects; itemsets: {frozenset of items: support}, as returned by
+        # Apriori.itemset_supports()
+        if not isinstance(rules, RuleSet):
+            rules = RuleSet.from_rules(rules)
+        itemsets = itemsets or {}
+        vocabulary = list(rules.vocabulary)
+        item_ids = {item: i for i, item in enumerate(vocabulary)}
+        lengths, ids = [0], []
+        for itemset in itemsets:
+            for item in itemset:
+                if item not in item_ids:
+                    item_ids[item] = len(vocabulary)
+                    vocabulary.append(item)
+            encoded = sorted(item_ids[item] for item in itemset)
+            ids.extend(encoded)
+            lengths.append(len(encoded))
+
+        rule_set = RuleSet(vocabulary, *(getattr(rules, name) for name in cls.RULE_COLUMNS))
+        itemset_columns = {
+            "itemset_offsets": np.cumsum(lengths, dtype=np.int64),
+            "itemset_items": np.asarray(ids, dtype=np.int32),
+            "itemset_support": np.fromiter(itemsets.values(), dtype=np.float64, count=len(itemsets)),
+        }
+        return cls(rule_set, itemset_columns)
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name in self.RULE_COLUMNS:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self.rule_set, name))
+        for name in self.ITEMSET_COLUMNS:
+            np.save(os.path.join(path, f"{name}.npy"), self.itemset_columns[name])
+        with open(os.path.join(path, "vocabulary.json"), "w") as f:
+            json.dump(self.vocabulary, f)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"format_version": self.FORMAT_VERSION, "rules": self.nb_rules,
+                       "itemsets": self.nb_itemsets}, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("format_version") != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported result format version: {meta.get('format_version')}")
+        with open(os.path.join(path, "vocabulary.json")) as f:
+            vocabulary = json.load(f)
+        mmap_mode = "r" if mmap else None
+
+        def column(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+
+        rule_set = RuleSet(vocabulary, *(column(name) for name in cls.RULE_COLUMNS))
+        return cls(rule_set, {name: column(name) for name in cls.ITEMSET_COLUMNS})
+
+    @property
+    def nb_rules(self):
+        return len(self.rule_set)
+
+    @property
+    def nb_itemsets(self):
+        return len(self.itemset_columns["itemset_support"])
+
+    def rules(self):
+        return self.rule_set
+
+    def itemsets(self):
+        offsets = self.itemset_columns["itemset_offsets"].tolist()
+        items = self.itemset_columns["itemset_items"].tolist()
+        supports = self.itemset_columns["itemset_support"].tolist()
+        return {frozenset(self.vocabulary[item] for item in items[offsets[i]:offsets[i + 1]]): support
+                for i, support in enumerate(supports)}
+
+    def __repr__(self):
+        return f"ResultStore(rules={self.nb_rules}, itemsets={self.nb_itemsets}, items={len(self.vocabulary)})"
@@ -1,4 +1,6 @@
 class Rule:
+    __slots__ = ("antecedent", "consequent", "support", "confidence", "lift")
+
     def __init__(self, antecedent, consequent, support, confidence, lift):
         self.antecedent = frozenset(antecedent)
         self.consequent = frozenset(consequent)
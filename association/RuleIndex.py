@@ -0,0 +1,148 @@
+# association/RuleIndex.py
+
+import numpy as np
+from association.Rule import Rule
+from association.RuleSet import RuleSet
+
+
+class RuleIndex:
+    # serves recommendations from mined rules without scanning them: antecedents (as sorted item ids)
+    # go into a prefix trie, so the rules that fire for a basket are exactly the nodes reachable by
+    # walking the basket's items in order. The trie is flat: node ids are assigned level by level and
+    # an edge is the sorted key parent * nb_items + item, so a walk is a searchsorted per level.
+    # Rules are ranked best first once; each node lists its rules again under every item of their
+    # consequent, ascending by rank, so a query only reads the lists of items missing from the basket
+    # (a consequent made of basket items is never touched) and only their heads, as deep as it takes
+    # for k answers to beat everything left unread.
+    def __init__(self, rules: RuleSet | list[Rule], rank_by="lift"):
+        if rank_by not in ("lift", "confidence"):
+            raise ValueError(f"Unknown rank_by: {rank_by}")
+        if not isinstance(rules, RuleSet):
+            rules = RuleSet.from_rules(rules)
+        self.rule_set = rules
+        self.rank_by = rank_by
+        self.item_ids = {item: i for i, item in enumerate(rules.vocabulary)}  # item -> id in the rule set
+        n, nb_items = len(rules), len(rules.vocabulary)
+
+        # rank -> rule index, best first (ties on rank_by broken by the other metrics)
+        self.ranked = rules.argsort(rank_by)
+
+        # node of every rule's antecedent; the edges of the trie are the sorted keys, child = position + 1
+        nodes, self.edge_keys = self._prefix_ids(rules.antecedent_offsets, rules.antecedent_items, nb_items)
+        self.nb_nodes = len(self.edge_keys) + 1
+        # the consequent trie is only used to give every distinct consequent an id
+        self.consequent_ids, _ = self._prefix_ids(rules.consequent_offsets, rules.consequent_items, nb_items)
+
+        # ranks of the rules of node v: order[node_bounds[v]:node_bounds[v + 1]], ascending
+        # (a stable sort of the ranks by node keeps them in rank order within a node)
+        ranked_nodes = nodes[self.ranked]
+        self.order = np.argsort(ranked_nodes, kind="stable")
+        self.node_bounds = np.zeros(self.nb_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ranked_nodes, minlength=self.nb_nodes), out=self.node_bounds[1:])
+
+        # the same ranks listed per (node, consequent item): segment s holds the rules of node
+        # segment_keys[s] // nb_items whose consequent contains segment_keys[s] % nb_items
+        offsets, items = RuleSet._gather(rules.consequent_offsets, rules.consequent_items, self.ranked)
+        entry_ranks = np.repeat(np.arange(n), np.diff(offsets))
+        keys = ranked_nodes[entry_ranks] * nb_items + items
+        by_key = np.argsort(keys, kind="stable")
+        self.consequent_order = entry_ranks[by_key]
+        keys = keys[by_key]
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))[:len(keys)]
+        self.segment_keys = keys[starts]
+        self.segment_bounds = np.append(starts, len(keys))
+        self.node_segments = np.searchsorted(self.segment_keys, np.arange(self.nb_nodes + 1) * nb_items)
+
+    @staticmethod
+    def _prefix_ids(offsets, items, nb_items):
+        # trie over the CSR rows built one level at a time: returns the node of every row and the sorted
+        # edge keys parent * nb_items + item (node ids grow with the level, so the keys come out sorted)
+        lengths = np.diff(offsets)
+        nodes = np.zeros(len(lengths), dtype=np.int64)
+        edge_keys, nb_nodes = [], 1
+        for level in range(int(lengths.max(initial=0))):
+            active = np.flatnonzero(lengths > level)
+            keys = nodes[active] * nb_items + items[offsets[active] + level]
+            level_keys, inverse = np.unique(keys, return_inverse=True)
+            nodes[active] = nb_nodes + inverse
+            edge_keys.append(level_keys)
+            nb_nodes += len(level_keys)
+        return nodes, np.concatenate(edge_keys) if edge_keys else np.zeros(0, dtype=np.int64)
+
+    @staticmethod
+    def _ranges(starts, stops):
+        # concatenation of arange(start, stop) over the pairs
+        lengths = stops - starts
+        bounds = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=bounds[1:])
+        return np.repeat(starts - bounds[:-1], lengths) + np.arange(bounds[-1])
+
+    def matching_rules(self, basket):
+        # every rule whose antecedent is a subset of the basket, best first
+        reached = self._reached(self._basket_ids(basket))
+        ranks = np.sort(self.order[self._ranges(self.node_bounds[reached], self.node_bounds[reached + 1])])
+        return [self.rule_set[i] for i in self.ranked[ranks].tolist()]
+
+    def _basket_ids(self, basket):
+        # items never seen in an antecedent or consequent cannot match anything
+        return np.array(sorted(self.item_ids[item] for item in set(basket) if item in self.item_ids), dtype=np.int64)
+
+    def _reached(self, ids):
+        # breadth-first walk: a frontier node at basket position p tries every basket item after p
+        nb_items = len(self.rule_set.vocabulary)
+        reached = [np.zeros(1, dtype=np.int64)]  # the root holds rules with an empty antecedent, if any
+        frontier, after = reached[0], np.zeros(1, dtype=np.int64)
+        while len(frontier) and len(self.edge_keys):
+            positions = self._ranges(after, np.full(len(after), len(ids)))
+            keys = np.repeat(frontier, len(ids) - after) * nb_items + ids[positions]
+            edges = np.minimum(np.searchsorted(self.edge_keys, keys), len(self.edge_keys) - 1)
+            found = self.edge_keys[edges] == keys
+            frontier, after = edges[found] + 1, positions[found] + 1
+            reached.append(frontier)
+        return np.concatenate(reached)
+
+    def recommend(self, basket, k=5):
+        # the k best consequents made only of items not already in the basket, each with the best rule
+        # that recommends it. Only the segments of items outside the basket are read, each from its head
+        # and a growing step at a time; the read stops once the k-th answer ranks before the next unread
+        # entry of every segment.
+        if k <= 0:
+            return []
+        ids = self._basket_ids(basket)
+        nb_items = len(self.rule_set.vocabulary)
+        in_basket = np.zeros(nb_items, dtype=bool)
+        in_basket[ids] = True
+        reached = self._reached(ids)
+        segments = self._ranges(self.node_segments[reached], self.node_segments[reached + 1])
+        segments = segments[~in_basket[self.segment_keys[segments] % nb_items]]
+        read, stops = self.segment_bounds[segments], self.segment_bounds[segments + 1]
+
+        offsets, items = self.rule_set.consequent_offsets, self.rule_set.consequent_items
+        kept, step = [], k
+        while True:
+            ends = np.minimum(stops, read + step)
+            ranks = self.consequent_order[self._ranges(read, ends)]
+            rules = self.ranked[ranks]
+            # a consequent listed under an item outside the basket may still hold basket items
+            touching = in_basket[items[self._ranges(offsets[rules], offsets[rules + 1])]]
+            overlapping = np.zeros(len(rules), dtype=bool)
+            overlapping[np.repeat(np.arange(len(rules)), offsets[rules + 1] - offsets[rules])[touching]] = True
+            kept.append(ranks[~overlapping])
+            read = ends
+            # best rule of every consequent, then the k best consequents
+            ranks = np.unique(np.concatenate(kept))
+            _, first = np.unique(self.consequent_ids[self.ranked[ranks]], return_index=True)
+            ranks = ranks[np.sort(first)[:k]]
+            unread = read < stops
+            if not unread.any() or (len(ranks) == k and ranks[-1] < self.consequent_order[read[unread]].min()):
+                return [self.rule_set[i] for i in self.ranked[ranks].tolist()]
+            kept, step = [ranks], step * 4
+
+    def recommend_batch(self, baskets, k=5):
+        return [self.recommend(basket, k) for basket in baskets]
+
+    def __len__(self):
+        return len(self.rule_set)
+
+    def __repr__(self):
+        return f"RuleIndex(rules={len(self.rule_set)}, nodes={self.nb_nodes}, rank_by={self.rank_by})"
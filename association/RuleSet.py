@@ -0,0 +1,194 @@
+# association/RuleSet.py
+
+import numpy as np
+from association.Rule import Rule
+
+METRICS = ("lift", "confidence", "support")
+
+
+class RuleView:
+    # lightweight stand-in for a Rule: a rule set and a row index, decoded on attribute access
+    __slots__ = ("rule_set", "index")
+
+    def __init__(self, rule_set, index):
+        self.rule_set = rule_set
+        self.index = index
+
+    @property
+    def antecedent(self):
+        return self.rule_set.antecedent(self.index)
+
+    @property
+    def consequent(self):
+        return self.rule_set.consequent(self.index)
+
+    @property
+    def support(self):
+        return float(self.rule_set.support[self.index])
+
+    @property
+    def confidence(self):
+        return float(self.rule_set.confidence[self.index])
+
+    @property
+    def lift(self):
+        return float(self.rule_set.lift[self.index])
+
+    __eq__ = Rule.__eq__
+    __hash__ = Rule.__hash__
+    __repr__ = Rule.__repr__
+
+
+class RuleSet:
+    # rules stored column-wise: support/confidence/lift as float arrays and antecedents/consequents as
+    # CSR item ids (antecedent_items[antecedent_offsets[i]:antecedent_offsets[i + 1]]) over a vocabulary.
+    # Filtering, sorting and top-k run on the arrays; Rule objects are only made on request.
+    def __init__(self, vocabulary, antecedent_offsets, antecedent_items, consequent_offsets, consequent_items,
+                 support, confidence, lift):
+        self.vocabulary = vocabulary  # item id -> item
+        self.antecedent_offsets = antecedent_offsets
+        self.antecedent_items = antecedent_items
+        self.consequent_offsets = consequent_offsets
+        self.consequent_items = consequent_items
+        self.support = support
+        self.confidence = confidence
+        self.lift = lift
+
+    @classmethod
+    def from_tuples(cls, rules, vocabulary=None):
+        # rules: (antecedent, consequent, support, confidence, lift) tuples. With a vocabulary the
+        # itemsets already hold its item ids (a TransactionStore's), otherwise items are interned here.
+        item_ids = None
+        if vocabulary is None:
+            vocabulary, item_ids = [], {}
+
+        def encode(itemset):
+            if item_ids is None:
+                return sorted(itemset)
+            ids = []
+            for item in itemset:
+                item_id = item_ids.get(item)
+                if item_id is None:
+                    item_id = item_ids[item] = len(vocabulary)
+                    vocabulary.append(item)
+                ids.append(item_id)
+            return sorted(ids)
+
+        antecedents, consequents = [], []
+        antecedent_lengths, consequent_lengths = [0], [0]
+        metrics = []
+        for antecedent, consequent, sup, conf, lift in rules:
+            encoded = encode(antecedent)
+            antecedents.extend(encoded)
+            antecedent_lengths.append(len(encoded))
+            encoded = encode(consequent)
+            consequents.extend(encoded)
+            consequent_lengths.append(len(encoded))
+            metrics.append((sup, conf, lift))
+        metrics = np.asarray(metrics, dtype=np.float64).reshape(-1, 3)
+        return cls(vocabulary,
+                   np.cumsum(antecedent_lengths, dtype=np.int64), np.asarray(antecedents, dtype=np.int32),
+                   np.cumsum(consequent_lengths, dtype=np.int64), np.asarray(consequents, dtype=np.int32),
+                   metrics[:, 0].copy(), metrics[:, 1].copy(), metrics[:, 2].copy())
+
+    @classmethod
+    def from_rules(cls, rules):
+        return cls.from_tuples((r.antecedent, r.consequent, r.support, r.confidence, r.lift) for r in rules)
+
+    def __len__(self):
+        return len(self.support)
+
+    def __getitem__(self, key):
+        # an integer gives a RuleView, a slice, index array or boolean mask gives a RuleSet
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += len(self)
+            if not 0 <= key < len(self):
+                raise IndexError("rule index out of range")
+            return RuleView(self, int(key))
+        return self.take(np.arange(len(self))[key])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield RuleView(self, i)
+
+    def antecedent_ids(self, i):
+        return self.antecedent_items[self.antecedent_offsets[i]:self.antecedent_offsets[i + 1]]
+
+    def consequent_ids(self, i):
+        return self.consequent_items[self.consequent_offsets[i]:self.consequent_offsets[i + 1]]
+
+    def antecedent(self, i):
+        return frozenset(self.vocabulary[item] for item in self.antecedent_ids(i).tolist())
+
+    def consequent(self, i):
+        return frozenset(self.vocabulary[item] for item in self.consequent_ids(i).tolist())
+
+    @staticmethod
+    def _gather(offsets, items, indices):
+        # CSR rows `indices` of (offsets, items) as a new CSR pair
+        starts = offsets[indices]
+        lengths = offsets[indices + 1] - starts
+        new_offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=new_offsets[1:])
+        positions = np.repeat(starts - new_offsets[:-1], lengths) + np.arange(new_offsets[-1])
+        return new_offsets, items[positions]
+
+    def take(self, indices):
+        indices = np.asarray(indices, dtype=np.int64)
+        antecedent_offsets, antecedent_items = self._gather(self.antecedent_offsets, self.antecedent_items, indices)
+        consequent_offsets, consequent_items = self._gather(self.consequent_offsets, self.consequent_items, indices)
+        return RuleSet(self.vocabulary, antecedent_offsets, antecedent_items, consequent_offsets, consequent_items,
+                       self.support[indices], self.confidence[indices], self.lift[indices])
+
+    def filter(self, min_support=None, min_confidence=None, min_lift=None, mask=None):
+        keep = np.ones(len(self), dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+        if min_support is not None:
+            keep &= self.support >= min_support
+        if min_confidence is not None:
+            keep &= self.confidence >= min_confidence
+        if min_lift is not None:
+            keep &= self.lift >= min_lift
+        return self.take(np.flatnonzero(keep))
+
+    def _keys(self, by):
+        # lexsort keys, least significant first: ties on `by` are broken by the other metrics
+        if by not in METRICS:
+            raise ValueError(f"Unknown rule metric '{by}'")
+        return [getattr(self, metric) for metric in reversed(METRICS) if metric != by] + [getattr(self, by)]
+
+    def argsort(self, by="lift", descending=True):
+        order = np.lexsort(self._keys(by))
+        return order[::-1] if descending else order
+
+    def sort(self, by="lift", descending=True):
+        return self.take(self.argsort(by, descending))
+
+    def top_k(self, k, by="lift"):
+        # argpartition on the main metric, then an exact sort of everything tied with the k-th value
+        if k <= 0:
+            return self.take([])
+        if k >= len(self):
+            return self.sort(by)
+        primary = getattr(self, by)
+        threshold = primary[np.argpartition(primary, len(self) - k)[len(self) - k]]
+        candidates = np.flatnonzero(primary >= threshold)
+        order = np.lexsort([key[candidates] for key in self._keys(by)])[::-1][:k]
+        return self.take(candidates[order])
+
+    def to_rules(self):
+        # one bulk read per column rather than decoding rule by rule
+        vocabulary = self.vocabulary
+        antecedents = self._split(self.antecedent_offsets, self.antecedent_items)
+        consequents = self._split(self.consequent_offsets, self.consequent_items)
+        return [Rule((vocabulary[i] for i in antecedent), (vocabulary[i] for i in consequent), sup, conf, lift)
+                for antecedent, consequent, sup, conf, lift in zip(antecedents, consequents, self.support.tolist(),
+                                                                   self.confidence.tolist(), self.lift.tolist())]
+
+    @staticmethod
+    def _split(offsets, items):
+        offsets, items = offsets.tolist(), items.tolist()
+        return (items[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1))
+
+    def __repr__(self):
+        return f"RuleSet(rules={len(self)}, items={len(self.vocabulary)})"
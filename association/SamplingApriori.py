@@ -0,0 +1,117 @@
+# association/SamplingApriori.py
+
+import math
+import random
+from association.Transaction import Transaction
+from association.TransactionStore import TransactionStore
+from association.Apriori import Apriori
+from association.VerticalCounter import VerticalCounter
+
+
+class SamplingApriori(Apriori):
+    # approximate mining on a random sample (Toivonen): by Hoeffding's bound, the support of an itemset
+    # in a sample of n transactions is within epsilon of its true support with probability 1 - delta when
+    # n >= ln(2 / delta) / (2 * epsilon^2).
+    # Without verification the sample is mined at min_support. That bound holds per itemset, so for the m
+    # itemsets tested in the sample the union bound gives joint_epsilon = sqrt(ln(2m / delta) / (2n)): with
+    # probability 1 - delta every itemset whose sample support clears min_support + joint_epsilon is frequent
+    # at once, and these are reported as guaranteed, the others as probabilistic.
+    # With verify, the sample is mined at min_support - epsilon, and its frequent itemsets and their
+    # negative border (infrequent itemsets whose subsets are all frequent) are counted once over the full
+    # data: if no border itemset turns out frequent the result is exact, otherwise the full data is mined
+    # normally.
+    def __init__(self, transactions: list[Transaction] | TransactionStore, min_support: float,
+                 min_confidence: float, sample_size=None, epsilon=None, delta=0.05, verify=False, seed=None,
+                 **kwargs):
+        super().__init__(transactions, min_support, min_confidence, **kwargs)
+        if sample_size is None and epsilon is None:
+            raise ValueError("Either sample_size or epsilon must be given")
+        if sample_size is None:
+            sample_size = math.ceil(math.log(2 / delta) / (2 * epsilon ** 2))
+        elif epsilon is None:
+            epsilon = math.sqrt(math.log(2 / delta) / (2 * sample_size))
+        self.sample_size = min(sample_size, len(transactions))
+        self.epsilon = epsilon
+        self.joint_epsilon = None  # epsilon holding for every itemset tested in the sample together
+        self.delta = delta
+        self.verify = verify
+        self.seed = seed
+        self.guaranteed = set()
+        self.probabilistic = set()
+        self.negative_border = []
+        self.missed = []  # verify: border itemsets frequent in the full data, the sample missed their supersets
+
+    def _sample(self):
+        rng = random.Random(self.seed)
+        indices = sorted(rng.sample(range(len(self.transactions)), self.sample_size))
+        if isinstance(self.transactions, TransactionStore):
+            rows = (self.transactions.row(i).tolist() for i in indices)
+        else:
+            rows = (self.transactions[i].items for i in indices)
+        # the sample's vocabulary maps its own ids back to the caller's items (or store ids)
+        return TransactionStore.from_item_lists(rows)
+
+    def _get_frequent_itemsets(self):
+        self.guaranteed, self.probabilistic = set(), set()
+        self.negative_border, self.missed = [], []
+        sample = self._sample()
+        threshold = max(self.min_support - self.epsilon, 0.0) if self.verify else self.min_support
+        miner = Apriori(sample, threshold, self.min_confidence,
+                        max_len=self.max_len, time_budget=self.time_budget, memory_limit_mb=self.memory_limit_mb,
+                        candidate_cap=self.candidate_cap)
+        miner._get_frequent_itemsets()
+        self.partial, self.stop_reason = miner.partial, miner.stop_reason
+        self.candidate_counts = miner.candidate_counts
+        sample_counts = {sample.decode(itemset): count for itemset, count in miner.support_counts.items()}
+        n, total = len(sample), len(self.transactions)
+        if n:
+            tested = max(sum(self.candidate_counts), 1)
+            self.joint_epsilon = math.sqrt(math.log(2 * tested / self.delta) / (2 * n))
+
+        # a sample cut short by a time or memory limit has an unchecked border, only its estimates are kept
+        if self.verify and self.stop_reason not in ("time_budget", "memory_limit"):
+            self.negative_border = [itemset for itemset in self._border(list(sample_counts), self._items())
+                                    if self.max_len is None or len(itemset) <= self.max_len]
+            return self._verify(sample_counts)
+
+        self.support_counts = {}
+        for itemset, count in sample_counts.items():
+            if count / n >= self.min_support:
+                self.support_counts[itemset] = round(count * total / n)  # estimated count in the full data
+                if count / n >= self.min_support + self.joint_epsilon:
+                    self.guaranteed.add(itemset)
+                else:
+                    self.probabilistic.add(itemset)
+        return list(self.support_counts)
+
+    def _items(self):
+        # every item of the full data: one missing from the sample is still in the negative border
+        if isinstance(self.transactions, TransactionStore):
+            return range(self.transactions.nb_items)
+        return set().union(*self._item_rows())
+
+    @staticmethod
+    def _border(frequent, items):
+        frequent_set = set(frequent)
+        levels = {}
+        for itemset in frequent:
+            levels.setdefault(len(itemset), []).append(itemset)
+        border = [frozenset([i]) for i in items if frozenset([i]) not in frequent_set]
+        for itemsets in levels.values():
+            border.extend(c for c in Apriori.apriori_gen(itemsets) if c not in frequent_set)
+        return border
+
+    def _verify(self, sample_counts):
+        self.counter = VerticalCounter(self.transactions)
+        candidates = list(sample_counts) + self.negative_border
+        counts = self.counter.count_candidates(candidates)
+        total = len(self.transactions)
+        border = set(self.negative_border)
+        self.missed = [c for c, count in zip(candidates, counts) if c in border and count / total >= self.min_support]
+        if self.missed:
+            frequent = super()._get_frequent_itemsets()
+        else:
+            self.support_counts = {c: count for c, count in zip(candidates, counts) if count / total >= self.min_support}
+            frequent = list(self.support_counts)
+        self.guaranteed = set(frequent)
+        return frequent
@@ -0,0 +1,147 @@
+# association/TransactionStore.py
+
+import numpy as np
+import pandas as pd
+from association.Transaction import Transaction
+
+
+class TransactionStore:
+    # items are interned to integer ids and transactions kept in a CSR layout:
+    # the (sorted) item ids of transaction i are items[offsets[i]:offsets[i + 1]]
+    def __init__(self):
+        self.vocabulary = []  # item id -> item, used to decode mined itemsets and rules
+        self.item_ids = {}  # item -> item id
+        self._offsets = np.zeros(16, dtype=np.int64)
+        self._items = np.zeros(64, dtype=np.int32)
+        self._nb_transactions = 0
+        self._nb_entries = 0
+
+    @classmethod
+    def from_transactions(cls, transactions: list[Transaction]):
+        store = cls()
+        store.extend(t.items for t in transactions)
+        return store
+
+    @classmethod
+    def from_item_lists(cls, rows):
+        store = cls()
+        store.extend(rows)
+        return store
+
+    @classmethod
+    def from_dataframe(cls, df):
+        store = cls()
+        store.extend_dataframe(df)
+        return store
+
+    @property
+    def offsets(self):
+        return self._offsets[:self._nb_transactions + 1]
+
+    @property
+    def items(self):
+        return self._items[:self._nb_entries]
+
+    @property
+    def nb_items(self):
+        return len(self.vocabulary)
+
+    def encode_item(self, item):
+        item_id = self.item_ids.get(item)
+        if item_id is None:
+            item_id = len(self.vocabulary)
+            self.item_ids[item] = item_id
+            self.vocabulary.append(item)
+        return item_id
+
+    def encode(self, itemset):
+        return frozenset(self.item_ids[item] for item in itemset)
+
+    def decode(self, itemset):
+        return frozenset(self.vocabulary[i] for i in itemset)
+
+    def add(self, items):
+        ids = sorted({self.encode_item(item) for item in items})
+        self._append_rows(np.asarray(ids, dtype=np.int32), np.asarray([len(ids)], dtype=np.int64))
+
+    def extend(self, rows):
+        for items in rows:
+            self.add(items)
+
+    def extend_dataframe(self, df):
+        # vectorized equivalent of adding [f"{col}={val}" for each non-null cell] row by row:
+        # each column is factorized once and its distinct values interned, then the id matrix is flattened
+        if not len(df):
+            return
+        id_matrix = np.empty((len(df), len(df.columns)), dtype=np.int32)
+        for j, col in enumerate(df.columns):
+            codes, uniques = pd.factorize(df[col])  # nulls get code -1
+            lookup = np.array([self.encode_item(f"{col}={str(val)}") for val in uniques] + [-1], dtype=np.int32)
+            id_matrix[:, j] = lookup[codes]
+
+        id_matrix.sort(axis=1)  # nulls (-1) move to the front of every row
+        present = id_matrix >= 0
+        self._append_rows(id_matrix[present], present.sum(axis=1))
+
+    def _append_rows(self, ids, lengths):
+        # ids: concatenated item ids of the new rows, lengths: number of ids in each new row
+        nb_rows, nb_ids = len(lengths), len(ids)
+        self._offsets = self._reserve(self._offsets, self._nb_transactions + nb_rows + 1)
+        self._items = self._reserve(self._items, self._nb_entries + nb_ids)
+
+        start = self._nb_transactions + 1
+        self._offsets[start:start + nb_rows] = self._nb_entries + np.cumsum(lengths)
+        self._items[self._nb_entries:self._nb_entries + nb_ids] = ids
+        self._nb_transactions += nb_rows
+        self._nb_entries += nb_ids
+
+    @staticmethod
+    def _reserve(array, size):
+        # grow geometrically so appending row by row stays amortized O(1)
+        if size <= len(array):
+            return array
+        grown = np.zeros(max(size, 2 * len(array)), dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def slice(self, start, stop):
+        # transactions start..stop-1 as a new store sharing this store's vocabulary
+        start, stop, _ = slice(start, stop).indices(self._nb_transactions)
+        stop = max(start, stop)
+        part = TransactionStore()
+        part.vocabulary = self.vocabulary
+        part.item_ids = self.item_ids
+        offsets = self.offsets[start:stop + 1]
+        part._offsets = offsets - offsets[0]
+        part._items = self._items[offsets[0]:offsets[-1]].copy()
+        part._nb_transactions = stop - start
+        part._nb_entries = len(part._items)
+        return part
+
+    def row(self, i):
+        return self._items[self._offsets[i]:self._offsets[i + 1]]
+
+    def rows(self):
+        # encoded transactions, as consumed by the miners
+        offsets = self.offsets.tolist()
+        items = self.items
+        for i in range(self._nb_transactions):
+            yield frozenset(items[offsets[i]:offsets[i + 1]].tolist())
+
+    def __len__(self):
+        return self._nb_transactions
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._nb_transactions
+        if not 0 <= i < self._nb_transactions:
+            raise IndexError("transaction index out of range")
+        return Transaction(tid=i + 1, items=self.decode(self.row(i).tolist()))
+
+    def __iter__(self):
+        # decoded Transaction objects, so the store can stand in for list[Transaction]
+        for i in range(self._nb_transactions):
+            yield self[i]
+
+    def __repr__(self):
+        return f"TransactionStore(transactions={len(self)}, items={self.nb_items}, entries={self._nb_entries})"
@@ -0,0 +1,97 @@
+from association.Transaction import Transaction
+from association.TransactionStore import TransactionStore
+
+
+class TrieCounter:
+    # horizontal counting: the candidates of a level go into a prefix trie (nested dicts keyed by
+    # their sorted items) and every transaction walks it once, bumping each candidate it contains.
+    # Identical transactions are merged into one row with a weight; with reduce, rows are trimmed
+    # after every level (see reduce) so later levels walk a shrinking dataset.
+    def __init__(self, transactions: list[Transaction] | TransactionStore, reduce=True):
+        if isinstance(transactions, TransactionStore):
+            item_rows = transactions.rows()
+        else:
+            item_rows = (t.items for t in transactions)
+        self.n_transactions = len(transactions)
+        self.all_rows = self._merge((tuple(sorted(items)), 1) for items in item_rows)
+        self.rows = self.all_rows  # (sorted items, weight) still worth walking
+        self.reduce_rows = reduce
+        # with reduce: the candidates of the current level (over all counted chunks), and for each row the
+        # indices into them of the candidates it holds
+        self.level_candidates = []
+        self.hits = [[] for _ in self.rows]
+
+    @staticmethod
+    def _merge(weighted_rows):
+        weights = {}
+        for row, weight in weighted_rows:
+            weights[row] = weights.get(row, 0) + weight
+        return list(weights.items())
+
+    def count_candidates(self, candidates):
+        counts = [0] * len(candidates)
+        if not candidates:
+            return counts
+        k = len(next(iter(candidates)))
+
+        # interior nodes map an item to the next level, the last level maps an item to the candidate's index
+        trie = {}
+        for index, candidate in enumerate(candidates):
+            node = trie
+            items = sorted(candidate)
+            for item in items[:-1]:
+                node = node.setdefault(item, {})
+            node[items[-1]] = index
+
+        # items in no candidate can never extend a walk, dropping them first keeps the walks short
+        used = set().union(*candidates)
+        offset = len(self.level_candidates)
+        if self.reduce_rows:
+            self.level_candidates.extend(candidates)
+        for (row, weight), row_hits in zip(self.rows, self.hits):
+            row = [item for item in row if item in used]
+            if len(row) >= k:
+                found = [] if self.reduce_rows else None
+                self._walk(trie, row, 0, k, counts, weight, found)
+                if found:
+                    row_hits.extend([index + offset for index in found] if offset else found)
+        return counts
+
+    def _walk(self, node, row, start, depth, counts, weight, found):
+        # the remaining depth - 1 items must still fit after position i
+        for i in range(start, len(row) - depth + 1):
+            child = node.get(row[i])
+            if child is None:
+                continue
+            if depth == 1:
+                counts[child] += weight
+                if found is not None:
+                    found.append(child)
+            else:
+                self._walk(child, row, i + 1, depth - 1, counts, weight, found)
+
+    def reduce(self, frequent):
+        # trimming once the level's frequent k-itemsets are known, from the candidates each row hit while
+        # counting: a (k+1)-candidate in a row brings k+1 frequent k-itemsets of that row with it, so a row
+        # holding fewer (in particular none) is dropped, and an item in none of the row's frequent
+        # k-itemsets is dropped from it. Rows that become identical are merged again.
+        if self.reduce_rows and frequent:
+            k = len(next(iter(frequent)))
+            frequent = set(frequent)
+            is_frequent = [candidate in frequent for candidate in self.level_candidates]
+            trimmed = []
+            for (row, weight), row_hits in zip(self.rows, self.hits):
+                held = [self.level_candidates[index] for index in row_hits if is_frequent[index]]
+                if len(held) > k:
+                    alive = set().union(*held)
+                    trimmed.append((tuple(item for item in row if item in alive), weight))
+            self.rows = self._merge(trimmed)
+        self.level_candidates = []
+        self.hits = [[] for _ in self.rows]
+        return len(self.rows)
+
+    def count(self, itemset):
+        return sum(weight for row, weight in self.all_rows if itemset.issubset(row))
+
+    def support(self, itemset):
+        return self.count(itemset) / self.n_transactions
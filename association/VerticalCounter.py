@@ -0,0 +1,67 @@
+import numpy as np
+from association.Transaction import Transaction
+from association.TransactionStore import TransactionStore
+
+
+class VerticalCounter:
+    # vertical layout: one bitset (python int) per item, bit i set <=> transaction i contains the item
+    def __init__(self, transactions: list[Transaction] | TransactionStore):
+        self.n_transactions = len(transactions)
+        self.all_bits = (1 << self.n_transactions) - 1
+        self.bitsets = self._build_bitsets(transactions)
+
+    def _build_bitsets(self, transactions):
+        if isinstance(transactions, TransactionStore):
+            return self._build_store_bitsets(transactions)
+
+        positions = {}
+        for pos, t in enumerate(transactions):
+            for item in t.items:
+                positions.setdefault(item, []).append(pos)
+
+        # set the bits in a byte buffer and convert once, OR-ing into a growing int is quadratic
+        nb_bytes = (self.n_transactions + 7) // 8
+        bitsets = {}
+        for item, tids in positions.items():
+            buffer = bytearray(nb_bytes)
+            for pos in tids:
+                buffer[pos >> 3] |= 1 << (pos & 7)
+            bitsets[item] = int.from_bytes(buffer, "little")
+        return bitsets
+
+    def _build_store_bitsets(self, store):
+        # CSR -> one sorted run of transaction positions per item id, bits set with numpy
+        lengths = np.diff(store.offsets)
+        positions = np.repeat(np.arange(len(store), dtype=np.int64), lengths)
+        order = np.argsort(store.items, kind="stable")
+        item_ids = store.items[order]
+        positions = positions[order]
+        bounds = np.searchsorted(item_ids, np.arange(store.nb_items + 1))
+
+        nb_bytes = (self.n_transactions + 7) // 8
+        bitsets = {}
+        for item_id in range(store.nb_items):
+            tids = positions[bounds[item_id]:bounds[item_id + 1]]
+            if not len(tids):
+                continue
+            buffer = np.zeros(nb_bytes, dtype=np.uint8)
+            np.bitwise_or.at(buffer, tids >> 3, (1 << (tids & 7)).astype(np.uint8))
+            bitsets[item_id] = int.from_bytes(buffer.tobytes(), "little")
+        return bitsets
+
+    def tidset(self, itemset):
+        bits = self.all_bits
+        for item in itemset:
+            bits &= self.bitsets.get(item, 0)
+            if not bits:
+                return 0
+        return bits
+
+    def count(self, itemset):
+        return self.tidset(itemset).bit_count()
+
+    def count_candidates(self, candidates):
+        return [self.count(itemset) for itemset in candidates]
+
+    def support(self, itemset):
+        return self.count(itemset) / self.n_transactions
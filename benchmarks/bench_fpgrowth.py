@@ -0,0 +1,37 @@
+# Compares FP-Growth and Apriori as the minimum support drops.
+# Run from the project root: python -m benchmarks.bench_fpgrowth
+from association.Apriori import Apriori
+from association.FPGrowth import FPGrowth
+from benchmarks.common import load_transactions, timed
+
+DATASETS = ["Titanic-Dataset.csv", "spotifydataset.csv"]
+MIN_SUPPORTS = [0.5, 0.4, 0.3, 0.25, 0.2, 0.15, 0.1]
+RUN_MIN_SUPPORT = 0.25  # below this the rule sets get too large to time full run() calls
+MIN_CONFIDENCE = 0.5
+
+
+def main():
+    print(f"{'dataset':<24}{'minsup':>8}{'itemsets':>10}{'apriori mine':>14}{'fp mine':>10}"
+          f"{'rules':>8}{'apriori run':>13}{'fp run':>9}")
+    for name in DATASETS:
+        transactions = load_transactions(name)
+        for min_support in MIN_SUPPORTS:
+            apriori_mine, apriori_sets = timed(
+                lambda: Apriori(transactions, min_support, MIN_CONFIDENCE)._get_frequent_itemsets())
+            fp_mine, fp_sets = timed(
+                lambda: FPGrowth(transactions, min_support, MIN_CONFIDENCE)._get_frequent_itemsets())
+            assert set(apriori_sets) == set(fp_sets), "miners disagree on frequent itemsets"
+            line = f"{name:<24}{min_support:>8.2f}{len(fp_sets):>10}{apriori_mine:>14.3f}{fp_mine:>10.3f}"
+
+            if min_support >= RUN_MIN_SUPPORT:
+                apriori_run, apriori_rules = timed(
+                    lambda: Apriori(transactions, min_support, MIN_CONFIDENCE).run(), repeat=1)
+                fp_run, fp_rules = timed(
+                    lambda: FPGrowth(transactions, min_support, MIN_CONFIDENCE).run(), repeat=1)
+                assert apriori_rules == fp_rules, "miners disagree on rules"
+                line += f"{len(fp_rules):>8}{apriori_run:>13.3f}{fp_run:>9.3f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# Compares the NumPy and pure Python K-means engines on synthetic Gaussian blobs.
+# Both engines start from the same centroids and reach the same clusters; the Python engine is only
+# timed on the smaller sizes.
+# Run from the project root: python -m benchmarks.bench_kmeans
+import numpy as np
+from clustering.Kmeans import Kmeans
+from benchmarks.common import timed
+
+SIZES = [(10_000, 20, 8), (50_000, 20, 8), (500_000, 20, 8)]
+PYTHON_MAX_POINTS = 50_000  # beyond this the Python engine takes minutes
+
+
+def make_blobs(nb_points, dim, nb_clusters, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(scale=10, size=(nb_clusters, dim))
+    return (centers[rng.integers(0, nb_clusters, nb_points)] + rng.normal(size=(nb_points, dim))).tolist()
+
+
+def run(data, nb_clusters, engine):
+    return Kmeans(data, nb_clusters, engine=engine, seed=0).kmeans()  # same initial centroids for both engines
+
+
+def main():
+    print(f"{'points':>8}{'dim':>5}{'k':>4}{'numpy':>10}{'python':>10}{'speedup':>9}")
+    for nb_points, dim, nb_clusters in SIZES:
+        data = make_blobs(nb_points, dim, nb_clusters)
+        numpy_time, numpy_clusters = timed(lambda: run(data, nb_clusters, "numpy"))
+        line = f"{nb_points:>8}{dim:>5}{nb_clusters:>4}{numpy_time:>10.3f}"
+        if nb_points <= PYTHON_MAX_POINTS:
+            python_time, python_clusters = timed(lambda: run(data, nb_clusters, "python"), repeat=1)
+            assert [len(c['data']) for c in numpy_clusters] == [len(c['data']) for c in python_clusters], \
+                "engines disagree on the clusters"
+            line += f"{python_time:>10.3f}{python_time / numpy_time:>8.0f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# Compares Lloyd, Elkan and Hamerly K-means iterations on synthetic Gaussian blobs for several k.
+# All three start from the same k-means++ centroids and must reach the same partition; the distance
+# columns count point-centroid distances computed and skipped through the triangle-inequality bounds.
+# Run from the project root: python -m benchmarks.bench_kmeans_accel
+from clustering.Kmeans import Kmeans, ALGORITHMS
+from benchmarks.bench_kmeans import make_blobs
+from benchmarks.common import timed
+
+NB_POINTS, DIM = 50_000, 20
+CLUSTER_COUNTS = [8, 64, 256]
+
+
+def run(data, nb_clusters, algorithm):
+    model = Kmeans(data, nb_clusters, init="k-means++", seed=0, algorithm=algorithm)
+    model.kmeans()
+    return model
+
+
+def main():
+    print(f"{'k':>4}{'algorithm':>10}{'time':>9}{'iters':>7}{'computed':>13}{'skipped':>13}{'skipped %':>11}")
+    for nb_clusters in CLUSTER_COUNTS:
+        data = make_blobs(NB_POINTS, DIM, nb_clusters)
+        reference = None
+        for algorithm in ALGORITHMS:
+            elapsed, model = timed(lambda: run(data, nb_clusters, algorithm))
+            if reference is None:
+                reference = model.labels
+            assert (model.labels == reference).all(), f"{algorithm} disagrees with lloyd"
+            computed, skipped = model.distance_stats["computed"], model.distance_stats["skipped"]
+            print(f"{nb_clusters:>4}{algorithm:>10}{elapsed:>9.3f}{model.n_iter:>7}{computed:>13}{skipped:>13}"
+                  f"{100 * skipped / (computed + skipped):>10.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# Compares random, k-means++ and k-means|| seeding: Lloyd iterations to converge, final inertia and time.
+# Run from the project root: python -m benchmarks.bench_kmeans_init
+import numpy as np
+from clustering.Kmeans import Kmeans, INIT_METHODS
+from benchmarks.bench_kmeans import make_blobs
+from benchmarks.common import timed
+
+SIZES = [(100_000, 20, 8), (100_000, 20, 32)]
+SEEDS = range(5)
+
+
+def inertia(model):
+    points = np.asarray(model.data, dtype=np.float64)
+    return float(((points - model.centroids[model.labels]) ** 2).sum())
+
+
+def main():
+    print(f"{'points':>8}{'dim':>5}{'k':>4}  {'init':<10}{'iterations':>11}{'inertia':>14}{'seconds':>9}")
+    for nb_points, dim, nb_clusters in SIZES:
+        data = make_blobs(nb_points, dim, nb_clusters)
+        for init in INIT_METHODS:
+            iterations, inertias, seconds = [], [], []
+            for seed in SEEDS:
+                model = Kmeans(data, nb_clusters, init=init, seed=seed)
+                elapsed, _ = timed(model.kmeans, repeat=1)
+                iterations.append(model.n_iter)
+                inertias.append(inertia(model))
+                seconds.append(elapsed)
+            # means over the seeds
+            print(f"{nb_points:>8}{dim:>5}{nb_clusters:>4}  {init:<10}{np.mean(iterations):>11.1f}"
+                  f"{np.mean(inertias):>14.4g}{np.mean(seconds):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
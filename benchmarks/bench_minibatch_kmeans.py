@@ -0,0 +1,59 @@
+# Streams a synthetic CSV through MiniBatchKmeans.partial_fit and compares it with in-memory Kmeans:
+# wall time, peak traced memory and the inertia both reach on the full data.
+# Run from the project root: python -m benchmarks.bench_minibatch_kmeans
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from clustering.Kmeans import Kmeans
+from clustering.MiniBatchKmeans import MiniBatchKmeans
+from utils.utils import Utils
+from benchmarks.bench_kmeans import make_blobs
+
+NB_POINTS, DIM, NB_CLUSTERS = 300_000, 10, 16
+CHUNKSIZE = 10_000
+
+
+def inertia(points, centroids):
+    _, distances = Kmeans._assign(points, np.einsum("ij,ij->i", points, points), centroids)
+    return distances.sum()
+
+
+def measured(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def in_memory(path):
+    model = Kmeans(Utils.prepare_data_for_clustering(path), NB_CLUSTERS, init="k-means++", seed=0)
+    model.kmeans()
+    return model.centroids
+
+
+def streamed(path):
+    model = MiniBatchKmeans(NB_CLUSTERS, seed=0)
+    model.fit(Utils.iter_numeric_batches(path, chunksize=CHUNKSIZE))
+    return model.centroids
+
+
+def main():
+    data = np.asarray(make_blobs(NB_POINTS, DIM, NB_CLUSTERS))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "blobs.csv")
+        pd.DataFrame(data, columns=[f"x{i}" for i in range(DIM)]).to_csv(path, index=False)
+        print(f"{NB_POINTS} points x {DIM} columns, k={NB_CLUSTERS}, csv {os.path.getsize(path) / 2 ** 20:.0f} MiB")
+        print(f"{'mode':>10}{'time':>9}{'peak MiB':>10}{'inertia':>14}")
+        for name, run in (("in-memory", in_memory), ("streamed", streamed)):
+            elapsed, peak, centroids = measured(lambda: run(path))
+            print(f"{name:>10}{elapsed:>9.2f}{peak:>10.1f}{inertia(data, centroids):>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# Scaling of the SON partitioned miner with the number of worker processes.
+# Run from the project root: python -m benchmarks.bench_parallel [max_workers] [replication]
+import os
+import sys
+from association.Apriori import Apriori
+from association.ParallelApriori import ParallelApriori
+from association.TransactionStore import TransactionStore
+from benchmarks.common import load_transactions, timed
+
+MIN_SUPPORT = 0.3
+MIN_CONFIDENCE = 0.5
+
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    replication = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    # the bundled dataset is small, so it is replicated to get a basket count worth splitting
+    transactions = load_transactions("spotifydataset.csv")
+    store = TransactionStore.from_transactions(transactions * replication)
+
+    serial_time, serial_sets = timed(
+        lambda: Apriori(store, MIN_SUPPORT, MIN_CONFIDENCE)._get_frequent_itemsets(), repeat=1)
+    print(f"{len(store)} transactions, minsup={MIN_SUPPORT}, {len(serial_sets)} frequent itemsets")
+    print(f"{'workers':>8}{'time (s)':>12}{'vs serial':>12}")
+    print(f"{'serial':>8}{serial_time:>12.3f}{1.0:>11.2f}x")
+    for n_workers in range(1, max_workers + 1):
+        parallel_time, parallel_sets = timed(
+            lambda: ParallelApriori(store, MIN_SUPPORT, MIN_CONFIDENCE, n_workers=n_workers)._get_frequent_itemsets(),
+            repeat=1)
+        assert set(parallel_sets) == set(serial_sets), "parallel result differs from the serial engine"
+        print(f"{n_workers:>8}{parallel_time:>12.3f}{serial_time / parallel_time:>11.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import os
+import time
+import pandas as pd
+
+from utils.utils import Utils
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "local_datasets")
+DATASETS = ["Titanic-Dataset.csv", "monthly-milk-production-pounds.csv", "spotifydataset.csv"]
+
+
+def load_transactions(name):
+    # same preprocessing as AssociationPrompt.run_apriori
+    path = os.path.join(DATASETS_DIR, name)
+    df = pd.read_csv(path)
+    if Utils.getDataType(path)["categorical_ratio"] != 1.0:
+        df = Utils.discretize_numeric_columns(df)
+    return Utils.parse_transactions(df, source_type='csv')
+
+
+def timed(func, repeat=3):
+    # best of `repeat` runs, returns (seconds, last result)
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
@@ -1,40 +1,412 @@
-import random
+import numpy as np
 from utils.utils import Utils
 
+BLOCK_ELEMENTS = 1 << 22  # point-centroid distances computed at once, bounds the temporary distance matrix
+INIT_METHODS = ("random", "k-means++", "k-means||")
+ALGORITHMS = ("lloyd", "elkan", "hamerly")
+EMPTY_STRATEGIES = ("farthest", "split")
+
 
 class Kmeans:
-    def __init__(self, data, nb_clusters):
+    def __init__(self, data, nb_clusters, engine="numpy", init="random", seed=None, oversampling=None, init_rounds=5,
+                 algorithm="lloyd", tol=1e-4, max_iter=300, inertia_tol=None, empty="farthest"):
         self.data = data
         self.nb_clusters = nb_clusters
+        if engine not in ("numpy", "python"):
+            raise ValueError(f"Unknown engine '{engine}'")
+        # 'numpy': vectorized Lloyd iterations over one float array, 'python': the original per-point loops
+        self.engine = engine
+        if init not in INIT_METHODS:
+            raise ValueError(f"Unknown init '{init}'")
+        # 'random': nb_clusters distinct points, 'k-means++': each next point drawn with probability
+        # proportional to its squared distance to the nearest chosen one, 'k-means||': a few rounds that
+        # each sample about oversampling (default 2 * nb_clusters) points at once, then k-means++ on that
+        # weighted sample. Every strategy picks data points, so both engines start from the same centroids.
+        self.init = init
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm '{algorithm}'")
+        if algorithm != "lloyd" and engine != "numpy":
+            raise ValueError(f"The {algorithm} algorithm needs the numpy engine")
+        # numpy engine: 'lloyd' computes every point-centroid distance each iteration; 'elkan' (a lower bound
+        # per point and centroid, n x k floats) and 'hamerly' (one lower bound per point) keep bounds through
+        # the triangle inequality and skip the distances that cannot change an assignment
+        self.algorithm = algorithm
+        if empty not in EMPTY_STRATEGIES:
+            raise ValueError(f"Unknown empty cluster strategy '{empty}'")
+        # stopping rules, checked after every centroid update: the centroids did not move, their total squared
+        # shift is at most tol times the mean per-column variance of the data, the inertia improved by at most
+        # inertia_tol (relative, off by default), or max_iter iterations ran
+        self.tol = tol
+        self.max_iter = max_iter
+        self.inertia_tol = inertia_tol
+        # a cluster left without points gets a new centroid: 'farthest' takes the point farthest from its
+        # centroid, 'split' the farthest point of the largest cluster, which the next assignment splits in two
+        self.empty = empty
+        self.seed = seed
+        self.oversampling = oversampling
+        self.init_rounds = init_rounds
+        self.rng = np.random.default_rng(seed)
+        self.n_iter = 0  # Lloyd iterations of the last run, including the one that met a stopping rule
+        self.distance_stats = {"computed": 0, "skipped": 0}  # point-centroid distances of the last run
+        self.inertia_history = []  # sum of squared distances to the assigned centroid, per iteration
+        self.inertia = None  # of the returned clusters
+        self.stop_reason = None  # 'converged', 'tol', 'inertia' or 'max_iter'
+        self.labels = None  # numpy engine: cluster index of every point
+        self.centroids = None  # numpy engine: (nb_clusters, dim) array
 
     def kmeans(self):
+        self.n_iter = 0
+        self.distance_stats = {"computed": 0, "skipped": 0}
+        self.inertia_history, self.inertia, self.stop_reason = [], None, None
         if self.nb_clusters == 1:
             return [{
                 'data': self.data,
                 'centroid': Utils.compute_centroid(self.data)
             }]
 
-        clusters = []
-        # get random numbers to initialize the centroids
-        nums = random.sample(range(len(self.data)), self.nb_clusters)
+        nums = self._init_indices(np.asarray(self.data, dtype=np.float64))
+
+        if self.nb_clusters == len(self.data):
+            return [{'data': [self.data[index]], 'centroid': self.data[index]} for index in nums]
+
+        if self.engine == "numpy":
+            return self._kmeans_numpy(nums)
+        return self._kmeans_python(nums)
+
+    def _init_indices(self, points):
+        if self.init == "random" or self.nb_clusters == len(points):
+            return self.rng.choice(len(points), self.nb_clusters, replace=False).tolist()
+        squared_norms = np.einsum("ij,ij->i", points, points)
+        if self.init == "k-means++":
+            return self._kmeans_plus_plus(points, squared_norms, np.ones(len(points)), self.nb_clusters)
+        return self._kmeans_parallel(points, squared_norms)
+
+    def _kmeans_plus_plus(self, points, squared_norms, weights, k):
+        # D^2 weighting: indices into points of k distinct seeds
+        chosen = [int(self.rng.choice(len(points), p=weights / weights.sum()))]
+        _, distances = self._assign(points, squared_norms, points[chosen])
+        for _ in range(1, k):
+            distances[chosen] = 0  # exactly, so rounding never draws a seed twice
+            scores = weights * distances
+            total = scores.sum()
+            if total > 0:
+                index = int(self.rng.choice(len(points), p=scores / total))
+            else:  # every point coincides with a seed: take any point not chosen yet
+                index = int(self.rng.choice(np.setdiff1d(np.arange(len(points)), chosen)))
+            chosen.append(index)
+            _, new_distances = self._assign(points, squared_norms, points[[index]])
+            np.minimum(distances, new_distances, out=distances)
+        return chosen
+
+    def _kmeans_parallel(self, points, squared_norms):
+        # k-means|| (Bahmani et al.): each round keeps every point independently with probability
+        # oversampling * D^2 / cost, so a handful of passes over the data give O(rounds * oversampling)
+        # candidates; each candidate is weighted by the points closest to it and k-means++ picks the k seeds
+        oversampling = self.oversampling or 2 * self.nb_clusters
+        candidates = [int(self.rng.integers(len(points)))]
+        _, distances = self._assign(points, squared_norms, points[candidates])
+        for _ in range(self.init_rounds):
+            cost = distances.sum()
+            if cost == 0:
+                break
+            sampled = np.flatnonzero(self.rng.random(len(points)) < oversampling * distances / cost)
+            if not len(sampled):
+                continue
+            candidates.extend(sampled.tolist())
+            _, new_distances = self._assign(points, squared_norms, points[sampled])
+            np.minimum(distances, new_distances, out=distances)
+
+        candidates = np.unique(candidates)
+        if len(candidates) < self.nb_clusters:  # top up with random points on tiny inputs
+            others = np.setdiff1d(np.arange(len(points)), candidates)
+            extra = self.rng.choice(others, self.nb_clusters - len(candidates), replace=False)
+            candidates = np.concatenate([candidates, extra])
+        labels, _ = self._assign(points, squared_norms, points[candidates])
+        weights = np.bincount(labels, minlength=len(candidates)).astype(np.float64)
+        weights[weights == 0] = 1e-12  # keep candidates nearest to nothing drawable as a last resort
+        chosen = self._kmeans_plus_plus(points[candidates], squared_norms[candidates], weights, self.nb_clusters)
+        return candidates[chosen].tolist()
+
+    def _kmeans_numpy(self, nums):
+        points = np.asarray(self.data, dtype=np.float64)
+        centroids = points[nums].copy()
+        squared_norms = np.einsum("ij,ij->i", points, points)
+        self._shift_tol = self.tol * points.var(axis=0).mean()
+        if self.algorithm == "elkan":
+            labels, centroids = self._elkan(points, squared_norms, centroids)
+        elif self.algorithm == "hamerly":
+            labels, centroids = self._hamerly(points, squared_norms, centroids)
+        else:
+            labels, centroids = self._lloyd(points, squared_norms, centroids)
+
+        self.labels, self.centroids = labels, centroids
+        self.inertia = self._inertia(points, labels, centroids)
+        order = np.argsort(labels, kind="stable")
+        bounds = np.searchsorted(labels[order], np.arange(self.nb_clusters + 1))
+        return [{
+            'data': [self.data[i] for i in order[bounds[j]:bounds[j + 1]].tolist()],
+            'centroid': centroids[j].tolist()
+        } for j in range(self.nb_clusters)]
+
+    def _lloyd(self, points, squared_norms, centroids):
+        while True:
+            self.n_iter += 1
+            labels, distances = self._assign(points, squared_norms, centroids)
+            self._count_distances(len(points) * len(centroids), len(points) * len(centroids))
+            new_centroids = self._step(points, labels, centroids, distances.sum())
+            if self.stop_reason:
+                return labels, new_centroids
+            centroids = new_centroids
+
+    def _step(self, points, labels, centroids, inertia=None):
+        # centroid update shared by the numpy algorithms: records the inertia of the assignment, reseeds
+        # empty clusters and sets stop_reason once a stopping rule is met
+        if inertia is None:
+            inertia = self._inertia(points, labels, centroids)
+        self.inertia_history.append(float(inertia))
+        new_centroids, counts = self._update(points, labels, centroids)
+        if not counts.all():
+            self._reseed(points, labels, new_centroids, counts)
+        self.stop_reason = self._stop_reason(float(((new_centroids - centroids) ** 2).sum()))
+        return new_centroids
+
+    def _stop_reason(self, shift):
+        if shift == 0:
+            return "converged"
+        if shift <= self._shift_tol:
+            return "tol"
+        history = self.inertia_history
+        if self.inertia_tol is not None and len(history) > 1 \
+                and history[-2] - history[-1] <= self.inertia_tol * history[-2]:
+            return "inertia"
+        if self.n_iter >= self.max_iter:
+            return "max_iter"
+        return None
+
+    def _reseed(self, points, labels, centroids, counts):
+        # gives every empty cluster a data point as centroid (see self.empty); counts are updated as if the
+        # chosen points had moved, so several empty clusters take different points
+        distances = self._point_distances(points, labels, centroids)
+        for j in np.flatnonzero(counts == 0):
+            if self.empty == "split":
+                # the largest cluster that still has a point off its centroid
+                for donor in np.argsort(-counts, kind="stable"):
+                    candidates = np.where(labels == donor, distances, -1)
+                    if candidates.max() > 0:
+                        break
+            else:
+                candidates = np.where(counts[labels] > 1, distances, -1)
+            index = candidates.argmax()
+            if candidates[index] <= 0:
+                return  # every point sits on its centroid: there is no distinct point left to take
+            centroids[j] = points[index]
+            distances[index] = -1
+            if self.empty == "split":
+                counts[j] = counts[donor] // 2
+                counts[donor] -= counts[j]
+            else:
+                counts[labels[index]] -= 1
+                counts[j] = 1
+
+    @classmethod
+    def _inertia(cls, points, labels, centroids):
+        return float(cls._point_distances(points, labels, centroids).sum())
+
+    @staticmethod
+    def _point_distances(points, labels, centroids):
+        # squared distance of every point to its assigned centroid, in blocks
+        distances = np.empty(len(points))
+        block = max(1, BLOCK_ELEMENTS // points.shape[1])
+        for start in range(0, len(points), block):
+            stop = start + block
+            differences = points[start:stop] - centroids[labels[start:stop]]
+            distances[start:stop] = np.einsum("ij,ij->i", differences, differences)
+        return distances
+
+    def _count_distances(self, computed, total):
+        self.distance_stats["computed"] += computed
+        self.distance_stats["skipped"] += total - computed
+
+    def _hamerly(self, points, squared_norms, centroids):
+        # upper: distance to the assigned centroid, lower: to the second closest. A point keeps its centroid
+        # while upper <= max(lower, half the distance from its centroid to the nearest other one).
+        n, k = len(points), len(centroids)
+        self.n_iter += 1
+        labels, upper, lower = self._two_nearest(points, squared_norms, centroids)
+        self._count_distances(n * k, n * k)
+
+        while True:
+            new_centroids = self._step(points, labels, centroids)
+            if self.stop_reason:
+                return labels, new_centroids
+            shift = np.sqrt(((new_centroids - centroids) ** 2).sum(axis=1))
+            centroids = new_centroids
+            self.n_iter += 1
 
+            upper += shift[labels]
+            # the lower bound drops by the largest move among the other centroids
+            moved_most = np.argsort(shift)[-2:]
+            lower -= np.where(labels == moved_most[1], shift[moved_most[0]], shift[moved_most[1]])
+            bound = np.maximum(lower, self._half_gaps(centroids)[labels])
+
+            check = np.flatnonzero(upper > bound)
+            computed = len(check)
+            upper[check] = self._pair_distances(points, centroids, check, labels[check])
+            check = check[upper[check] > bound[check]]
+            if len(check):
+                labels[check], upper[check], lower[check] = self._two_nearest(points[check], squared_norms[check],
+                                                                              centroids)
+                computed += len(check) * k
+            self._count_distances(computed, n * k)
+
+    def _elkan(self, points, squared_norms, centroids):
+        # upper: distance to the assigned centroid, lower[i, j]: a bound on the distance from point i to
+        # centroid j. Distances are only computed for pairs where lower and half the centroid-centroid
+        # distance both fail to rule centroid j out.
+        n, k = len(points), len(centroids)
+        self.n_iter += 1
+        lower = self._distances(points, squared_norms, centroids)
+        self._count_distances(n * k, n * k)
+        labels = lower.argmin(axis=1)
+        upper = lower[np.arange(n), labels]
+
+        while True:
+            new_centroids = self._step(points, labels, centroids)
+            if self.stop_reason:
+                return labels, new_centroids
+            shift = np.sqrt(((new_centroids - centroids) ** 2).sum(axis=1))
+            centroids = new_centroids
+            self.n_iter += 1
+
+            lower -= shift
+            np.maximum(lower, 0, out=lower)
+            upper += shift[labels]
+            half_distances = 0.5 * self._centroid_distances(centroids)
+            np.fill_diagonal(half_distances, np.inf)
+
+            active = np.flatnonzero(upper > half_distances.min(axis=1)[labels])
+            assigned = labels[active]
+            rows = np.arange(len(active))
+            candidate = (upper[active, None] > lower[active]) & (upper[active, None] > half_distances[assigned])
+            tighten = active[candidate.any(axis=1)]
+            computed = len(tighten)
+            upper[tighten] = np.sqrt(((points[tighten] - centroids[labels[tighten]]) ** 2).sum(axis=1))
+            lower[tighten, labels[tighten]] = upper[tighten]
+            candidate &= (upper[active, None] > lower[active]) & (upper[active, None] > half_distances[assigned])
+
+            pair_rows, pair_centroids = np.nonzero(candidate)
+            pair_points = active[pair_rows]
+            distances = self._pair_distances(points, centroids, pair_points, pair_centroids)
+            computed += len(distances)
+            lower[pair_points, pair_centroids] = distances
+
+            # best of the current centroid and the computed candidates, per active point
+            options = np.full((len(active), k), np.inf)
+            options[pair_rows, pair_centroids] = distances
+            options[rows, assigned] = upper[active]
+            best = options.argmin(axis=1)
+            labels[active] = best
+            upper[active] = options[rows, best]
+            self._count_distances(computed, n * k)
+
+    def _half_gaps(self, centroids):
+        # half the distance from every centroid to its nearest other centroid
+        distances = self._centroid_distances(centroids)
+        np.fill_diagonal(distances, np.inf)
+        return 0.5 * distances.min(axis=1)
+
+    @staticmethod
+    def _centroid_distances(centroids):
+        norms = np.einsum("ij,ij->i", centroids, centroids)
+        return np.sqrt(np.maximum(norms[:, None] - 2 * centroids @ centroids.T + norms, 0))
+
+    @staticmethod
+    def _distances(points, squared_norms, centroids):
+        # full (points x centroids) Euclidean distance matrix
+        norms = np.einsum("ij,ij->i", centroids, centroids)
+        return np.sqrt(np.maximum(squared_norms[:, None] - 2 * points @ centroids.T + norms, 0))
+
+    @staticmethod
+    def _pair_distances(points, centroids, point_indices, centroid_indices):
+        # distance of each (point, centroid) pair, in blocks so the differences stay small
+        distances = np.empty(len(point_indices))
+        block = max(1, BLOCK_ELEMENTS // points.shape[1])
+        for start in range(0, len(point_indices), block):
+            stop = start + block
+            differences = points[point_indices[start:stop]] - centroids[centroid_indices[start:stop]]
+            distances[start:stop] = np.sqrt(np.einsum("ij,ij->i", differences, differences))
+        return distances
+
+    @staticmethod
+    def _assign(points, squared_norms, centroids):
+        # nearest centroid and squared distance to it for every point:
+        # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2, one matrix product per block of points
+        labels = np.empty(len(points), dtype=np.int64)
+        min_distances = np.empty(len(points))
+        centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+        block = max(1, BLOCK_ELEMENTS // len(centroids))
+        for start in range(0, len(points), block):
+            stop = start + block
+            distances = squared_norms[start:stop, None] - 2 * points[start:stop] @ centroids.T + centroid_norms
+            labels[start:stop] = distances.argmin(axis=1)
+            min_distances[start:stop] = distances[np.arange(len(distances)), labels[start:stop]]
+        np.maximum(min_distances, 0, out=min_distances)  # rounding can push a zero distance below 0
+        return labels, min_distances
+
+    @staticmethod
+    def _two_nearest(points, squared_norms, centroids):
+        # nearest centroid, distance to it and to the second nearest for every point, in blocks like _assign
+        labels = np.empty(len(points), dtype=np.int64)
+        nearest, second = np.empty(len(points)), np.full(len(points), np.inf)
+        centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+        block = max(1, BLOCK_ELEMENTS // len(centroids))
+        for start in range(0, len(points), block):
+            stop = start + block
+            distances = squared_norms[start:stop, None] - 2 * points[start:stop] @ centroids.T + centroid_norms
+            rows = np.arange(len(distances))
+            labels[start:stop] = distances.argmin(axis=1)
+            nearest[start:stop] = distances[rows, labels[start:stop]]
+            if len(centroids) > 1:
+                distances[rows, labels[start:stop]] = np.inf
+                second[start:stop] = distances.min(axis=1)
+        return labels, np.sqrt(np.maximum(nearest, 0)), np.sqrt(np.maximum(second, 0))
+
+    @staticmethod
+    def _update(points, labels, centroids):
+        k = len(centroids)
+        counts = np.bincount(labels, minlength=k)
+        # per-column weighted bincounts, faster than np.add.at on the whole array
+        sums = np.empty_like(centroids)
+        for j in range(points.shape[1]):
+            sums[:, j] = np.bincount(labels, weights=points[:, j], minlength=k)
+        new_centroids = centroids.copy()  # an empty cluster keeps its centroid until reseeded
+        filled = counts > 0
+        new_centroids[filled] = sums[filled] / counts[filled, None]
+        return new_centroids, counts
+
+    def _kmeans_python(self, nums):
+        clusters = []
         for index in nums:
             clusters.append({
                 'data': [self.data[index]],
                 'centroid': self.data[index]
             })
 
-        if self.nb_clusters == len(self.data):
-            return clusters
-
         old_centroids = []
         for cluster in clusters:
             old_centroids.append(cluster['centroid'])
 
+        dim = len(self.data[0])
+        means = [sum(point[i] for point in self.data) / len(self.data) for i in range(dim)]
+        variance = sum((point[i] - means[i]) ** 2 for point in self.data for i in range(dim)) / len(self.data)
+        self._shift_tol = self.tol * variance / dim
+
         while True:
+            self.n_iter += 1
             for cluster in clusters:
                 cluster['data'] = []
 
+            inertia = 0.0
             for point in self.data:
                 closest_cluster_index = 0
                 min_distance = Utils.euclidean_distance(point, clusters[0]['centroid'])
@@ -45,16 +417,57 @@ class Kmeans:
                         closest_cluster_index = i
                 # add the point to the closest cluster
                 clusters[closest_cluster_index]['data'].append(point)
+                inertia += min_distance ** 2
+            self.inertia_history.append(inertia)
 
             new_centroids = []
-            # update the centroids
+            # update the centroids, an empty cluster keeps its centroid until reseeded
             for cluster in clusters:
-                new_centroid = Utils.compute_centroid(cluster['data'])
+                if cluster['data']:
+                    new_centroids.append(Utils.compute_centroid(cluster['data']))
+                else:
+                    new_centroids.append(cluster['centroid'])
+            if not all(cluster['data'] for cluster in clusters):
+                self._reseed_python(clusters, new_centroids)
+            for cluster, new_centroid in zip(clusters, new_centroids):
                 cluster['centroid'] = new_centroid
-                new_centroids.append(new_centroid)
 
-            # stop the algorithm if the centroids have not changed
-            if new_centroids == old_centroids:
+            shift = sum(Utils.euclidean_distance(old, new) ** 2 for old, new in zip(old_centroids, new_centroids))
+            self.stop_reason = self._stop_reason(shift)
+            if self.stop_reason:
+                self.inertia = sum(Utils.euclidean_distance(point, cluster['centroid']) ** 2
+                                   for cluster in clusters for point in cluster['data'])
                 return clusters
 
             old_centroids = new_centroids
+
+    def _reseed_python(self, clusters, centroids):
+        # same choices as _reseed, over the cluster lists
+        counts = [len(cluster['data']) for cluster in clusters]
+        taken = set()
+        for j in range(len(clusters)):
+            if counts[j]:
+                continue
+            if self.empty == "split":
+                donors = sorted(range(len(counts)), key=lambda i: -counts[i])
+            else:
+                donors = [i for i, count in enumerate(counts) if count > 1]
+            best, best_distance = None, 0
+            for i in donors:
+                for index, point in enumerate(clusters[i]['data']):
+                    distance = Utils.euclidean_distance(point, centroids[i]) ** 2
+                    if distance > best_distance and (i, index) not in taken:
+                        best, best_distance = (i, index), distance
+                if self.empty == "split" and best is not None:
+                    break  # the largest cluster that still has a point off its centroid
+            if best is None:
+                return  # every point sits on its centroid: there is no distinct point left to take
+            taken.add(best)
+            donor, index = best
+            centroids[j] = list(clusters[donor]['data'][index])
+            if self.empty == "split":
+                counts[j] = counts[donor] // 2
+                counts[donor] -= counts[j]
+            else:
+                counts[donor] -= 1
+                counts[j] = 1
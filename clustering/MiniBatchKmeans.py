@@ -0,0 +1,91 @@
+import numpy as np
+from clustering.Kmeans import Kmeans
+
+
+class MiniBatchKmeans(Kmeans):
+    # Mini-batch K-means (Sculley, 2010): each batch is assigned to the current centroids and every centroid
+    # moves towards the mean of its batch points with a per-center learning rate of 1 / (points seen so far),
+    # so a centroid is the running mean of everything ever assigned to it. Only the centroids and per-center
+    # counts persist between batches, so a stream (e.g. Utils.iter_numeric_batches over a large CSV) is
+    # clustered in bounded memory, and new data can keep refining a fitted model.
+    def __init__(self, nb_clusters, data=None, batch_size=1024, max_steps=100, init="k-means++", seed=None,
+                 **kwargs):
+        super().__init__(data, nb_clusters, init=init, seed=seed, **kwargs)
+        self.batch_size = batch_size  # points drawn per step by kmeans() on in-memory data
+        self.max_steps = max_steps
+        self.counts = None  # points assigned to every centroid so far
+        self.n_seen = 0
+        self.batch_inertia = None  # sum of squared distances of the last batch to its centroids, see inertia_history
+        self._pending = []  # batches buffered until there are enough points to seed the centroids
+
+    def partial_fit(self, batch):
+        # batch: rows of numbers (list of lists, numpy array or numeric DataFrame chunk)
+        points = np.asarray(batch, dtype=np.float64)
+        if points.ndim != 2 or not len(points):
+            return self
+        if self.centroids is None:
+            self._pending.append(points)
+            if sum(len(p) for p in self._pending) < self.nb_clusters:
+                return self
+            points = np.concatenate(self._pending)
+            self._pending = []
+            self.centroids = points[self._init_indices(points)].copy()
+            self.counts = np.zeros(self.nb_clusters, dtype=np.int64)
+        elif points.shape[1] != self.centroids.shape[1]:
+            raise ValueError(f"Batch has {points.shape[1]} columns, the model was fitted on "
+                             f"{self.centroids.shape[1]}")
+
+        self.n_iter += 1
+        squared_norms = np.einsum("ij,ij->i", points, points)
+        labels, distances = self._assign(points, squared_norms, self.centroids)
+        self._count_distances(len(points) * self.nb_clusters, len(points) * self.nb_clusters)
+        self.batch_inertia = float(distances.sum())
+        self.inertia_history.append(self.batch_inertia)
+
+        batch_counts = np.bincount(labels, minlength=self.nb_clusters)
+        sums = np.empty_like(self.centroids)
+        for j in range(points.shape[1]):
+            sums[:, j] = np.bincount(labels, weights=points[:, j], minlength=self.nb_clusters)
+        filled = batch_counts > 0
+        self.counts += batch_counts
+        # c += (sum of batch points - n_batch * c) / n_total, the per-point 1 / count steps taken at once
+        self.centroids[filled] += (sums[filled] - batch_counts[filled, None] * self.centroids[filled]) \
+            / self.counts[filled, None]
+        self.n_seen += len(points)
+        return self
+
+    def fit(self, batches):
+        for batch in batches:
+            self.partial_fit(batch)
+        return self
+
+    def predict(self, batch):
+        if self.centroids is None:
+            raise ValueError("The model has not seen enough points to place its centroids yet")
+        points = np.asarray(batch, dtype=np.float64)
+        labels, _ = self._assign(points, np.einsum("ij,ij->i", points, points), self.centroids)
+        return labels
+
+    def kmeans(self):
+        # in-memory data: max_steps random batches, then one full assignment to build the clusters
+        points = np.asarray(self.data, dtype=np.float64)
+        if self.nb_clusters >= len(points):
+            return super().kmeans()
+        self.n_iter = 0
+        self.distance_stats = {"computed": 0, "skipped": 0}
+        self.inertia_history, self.stop_reason = [], "max_iter"
+        self.centroids = points[self._init_indices(points)].copy()  # seeded from the whole data set
+        self.counts = np.zeros(self.nb_clusters, dtype=np.int64)
+        self.n_seen, self._pending = 0, []
+        batch_size = min(self.batch_size, len(points))
+        for _ in range(self.max_steps):
+            self.partial_fit(points[self.rng.choice(len(points), batch_size, replace=False)])
+
+        self.labels = self.predict(points)
+        self.inertia = self._inertia(points, self.labels, self.centroids)
+        order = np.argsort(self.labels, kind="stable")
+        bounds = np.searchsorted(self.labels[order], np.arange(self.nb_clusters + 1))
+        return [{
+            'data': [self.data[i] for i in order[bounds[j]:bounds[j + 1]].tolist()],
+            'centroid': self.centroids[j].tolist()
+        } for j in range(self.nb_clusters)]
@@ -3,10 +3,14 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from tkinter.scrolledtext import ScrolledText
 from association.Apriori import Apriori
+from association.FPGrowth import FPGrowth
+from association.Eclat import Eclat
+from association.ParallelApriori import ParallelApriori
+from association.ResultStore import ResultStore
 from visualizer.GraphVisualizer import GraphVisualizer
-import pandas as pd
 import urllib.request
 import threading
+from functools import partial
 import json
 import os
 
@@ -19,6 +23,11 @@ class AssociationPrompt(tk.Toplevel):
         self.geometry("750x700")
         self.transactions = []
         self.rules = set()
+        self.itemsets = {}
+        self.algorithms = {"Apriori": Apriori, "Apriori (trie counting)": partial(Apriori, counting="trie"),
+                           "FP-Growth": FPGrowth, "Eclat": Eclat,
+                           "dEclat (diffsets)": partial(Eclat, use_diffsets=True),
+                           "Parallel Apriori (SON)": ParallelApriori}
         self.local_dataset_map = self.load_dataset_info()
         self.local_dataset_names = list(self.local_dataset_map.keys())
         self.selected_local = tk.StringVar()
@@ -88,7 +97,37 @@ class AssociationPrompt(tk.Toplevel):
         self.conf_entry.insert(0, "0.5")
         self.conf_entry.grid(row=1, column=1, padx=5, pady=5)
 
-        self.run_button = ttk.Button(self, text="Run Apriori", command=self.start_thread)
+        ttk.Label(param_frame, text="Algorithm:").grid(row=2, column=0, padx=5, pady=5, sticky=tk.W)
+        self.algorithm = tk.StringVar(value="Apriori")
+        ttk.Combobox(param_frame, textvariable=self.algorithm, values=list(self.algorithms.keys()),
+                     state='readonly').grid(row=2, column=1, padx=5, pady=5)
+
+        ttk.Label(param_frame, text="Itemsets:").grid(row=3, column=0, padx=5, pady=5, sticky=tk.W)
+        self.itemset_mode = tk.StringVar(value="all")
+        ttk.Combobox(param_frame, textvariable=self.itemset_mode, values=["all", "closed", "maximal"],
+                     state='readonly').grid(row=3, column=1, padx=5, pady=5)
+
+        ttk.Label(param_frame, text="Top-k Rules by Lift (blank = all):").grid(row=4, column=0, padx=5, pady=5,
+                                                                               sticky=tk.W)
+        self.top_k_entry = ttk.Entry(param_frame)
+        self.top_k_entry.grid(row=4, column=1, padx=5, pady=5)
+
+        ttk.Label(param_frame, text="Max Itemset Length (blank = none):").grid(row=5, column=0, padx=5, pady=5,
+                                                                             sticky=tk.W)
+        self.max_len_entry = ttk.Entry(param_frame)
+        self.max_len_entry.grid(row=5, column=1, padx=5, pady=5)
+
+        ttk.Label(param_frame, text="Time Budget in Seconds (blank = none):").grid(row=6, column=0, padx=5, pady=5,
+                                                                                 sticky=tk.W)
+        self.time_budget_entry = ttk.Entry(param_frame)
+        self.time_budget_entry.grid(row=6, column=1, padx=5, pady=5)
+
+        ttk.Label(param_frame, text="Memory Limit in MB (blank = none):").grid(row=7, column=0, padx=5, pady=5,
+                                                                             sticky=tk.W)
+        self.memory_limit_entry = ttk.Entry(param_frame)
+        self.memory_limit_entry.grid(row=7, column=1, padx=5, pady=5)
+
+        self.run_button = ttk.Button(self, text="Run Mining", command=self.start_thread)
         self.run_button.pack(pady=10)
 
         self.loader = ttk.Label(self, text="Processing... Please wait.")
@@ -98,9 +137,15 @@ class AssociationPrompt(tk.Toplevel):
         self.output_text = ScrolledText(self, height=15)
         self.output_text.pack(fill="both", padx=10, pady=10)
 
-        self.visualize_button = ttk.Button(self, text="Visualize Rules", command=self.visualize_rules,
+        results_frame = ttk.Frame(self)
+        results_frame.pack(pady=5)
+        self.visualize_button = ttk.Button(results_frame, text="Visualize Rules", command=self.visualize_rules,
                                            state=tk.DISABLED)
-        self.visualize_button.pack(pady=5)
+        self.visualize_button.pack(side=tk.LEFT, padx=5)
+        self.save_button = ttk.Button(results_frame, text="Save Results", command=self.save_results,
+                                      state=tk.DISABLED)
+        self.save_button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(results_frame, text="Load Results", command=self.load_results).pack(side=tk.LEFT, padx=5)
 
 
 
@@ -154,11 +199,7 @@ class AssociationPrompt(tk.Toplevel):
                 path = os.path.join("local_datasets", selected_file)
                 if not os.path.exists(path):
                     raise FileNotFoundError(f"File '{selected_file}' not found in 'local_datasets'.")
-                df = pd.read_csv(path)
-                dtype_info = Utils.getDataType(path)
-                if dtype_info["categorical_ratio"] != 1.0:
-                    df = Utils.discretize_numeric_columns(df)
-                self.transactions = Utils.parse_transactions(df, source_type='csv')
+                self.transactions = Utils.stream_transaction_store(path)
                 self.run_apriori_postload()
 
             elif method == "url":
@@ -168,11 +209,7 @@ class AssociationPrompt(tk.Toplevel):
 
             else:
                 path = self.input_frames[method].entry.get()
-                df = pd.read_csv(path)
-                dtype_info = Utils.getDataType(path)
-                if dtype_info["categorical_ratio"] != 1.0:
-                    df = Utils.discretize_numeric_columns(df)
-                self.transactions = Utils.parse_transactions(df, source_type='csv')
+                self.transactions = Utils.stream_transaction_store(path)
                 self.run_apriori_postload()
 
         except Exception as e:
@@ -183,11 +220,7 @@ class AssociationPrompt(tk.Toplevel):
     def load_from_url(self, url):
         try:
             path, _ = urllib.request.urlretrieve(url)
-            df = pd.read_csv(path)
-            dtype_info = Utils.getDataType(path)
-            if dtype_info["categorical_ratio"] != 1.0:
-                df = Utils.discretize_numeric_columns(df)
-            self.transactions = Utils.parse_transactions(df, source_type='csv')
+            self.transactions = Utils.stream_transaction_store(path)
             self.run_apriori_postload()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load URL data: {str(e)}")
@@ -199,18 +232,29 @@ class AssociationPrompt(tk.Toplevel):
             minsup_count = int(self.support_entry.get())
             minconf = float(self.conf_entry.get())
             minsup = minsup_count / len(self.transactions)
-
-            model = Apriori(self.transactions, minsup, minconf)
+            top_k = int(self.top_k_entry.get()) if self.top_k_entry.get().strip() else None
+            max_len = int(self.max_len_entry.get()) if self.max_len_entry.get().strip() else None
+            time_budget = float(self.time_budget_entry.get()) if self.time_budget_entry.get().strip() else None
+            memory_limit_mb = float(self.memory_limit_entry.get()) if self.memory_limit_entry.get().strip() else None
+
+            model = self.algorithms[self.algorithm.get()](self.transactions, minsup, minconf,
+                                                          itemset_mode=self.itemset_mode.get(), top_k=top_k,
+                                                          max_len=max_len, time_budget=time_budget,
+                                                          memory_limit_mb=memory_limit_mb)
             self.rules = model.run()
+            self.itemsets = model.itemset_supports()
 
-            if not self.rules:
-                self.output_text.insert(tk.END, "No rules found.\n")
-            else:
-                self.output_text.insert(tk.END, "=== Association Rules ===\n")
-                for rule in sorted(self.rules, key=lambda r: r.lift, reverse=True):
-                    self.output_text.insert(tk.END, f"{rule}\n")
+            if model.candidate_counts:
+                self.output_text.insert(tk.END, f"Candidates per level: {model.candidate_counts}\n")
+            if model.rows_per_level:
+                self.output_text.insert(tk.END, f"Transactions per level: {model.rows_per_level}\n")
+            if model.partial:
+                self.output_text.insert(tk.END, f"Partial results: stopped at the {model.stop_reason} limit, "
+                                                f"only the finished levels and the rules built in time are used.\n")
+            self.display_rules()
 
             self.visualize_button.config(state=tk.NORMAL)
+            self.save_button.config(state=tk.NORMAL)
         except Exception as e:
             messagebox.showerror("Error", str(e))
         finally:
@@ -218,6 +262,42 @@ class AssociationPrompt(tk.Toplevel):
             self.loader.pack_forget()
             self.output_text.config(state=tk.DISABLED)
 
+    def display_rules(self):
+        if not self.rules:
+            self.output_text.insert(tk.END, "No rules found.\n")
+        else:
+            self.output_text.insert(tk.END, "=== Association Rules ===\n")
+            for rule in sorted(self.rules, key=lambda r: r.lift, reverse=True):
+                self.output_text.insert(tk.END, f"{rule}\n")
+
+    def save_results(self):
+        path = filedialog.askdirectory(title="Choose a folder for the results")
+        if not path:
+            return
+        try:
+            ResultStore.from_results(self.rules, self.itemsets).save(path)
+            messagebox.showinfo("Saved", f"Saved {len(self.rules)} rules and {len(self.itemsets)} itemsets.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save results: {str(e)}")
+
+    def load_results(self):
+        path = filedialog.askdirectory(title="Choose a saved results folder")
+        if not path:
+            return
+        try:
+            results = ResultStore.load(path)
+            self.rules = set(results.rules().to_rules())
+            self.itemsets = results.itemsets()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load results: {str(e)}")
+            return
+        self.output_text.config(state=tk.NORMAL)
+        self.output_text.delete("1.0", tk.END)
+        self.display_rules()
+        self.output_text.config(state=tk.DISABLED)
+        self.visualize_button.config(state=tk.NORMAL)
+        self.save_button.config(state=tk.NORMAL)
+
     def visualize_rules(self):
         if self.rules:
             GraphVisualizer(self.rules).plot_graph()
@@ -273,8 +353,10 @@ class AssociationPrompt(tk.Toplevel):
 
         # Reset state
         self.visualize_button.config(state=tk.DISABLED)
+        self.save_button.config(state=tk.DISABLED)
         self.loader.pack_forget()
 
         # Clear previous transactions and rules
         self.transactions = []
         self.rules = set()
+        self.itemsets = {}
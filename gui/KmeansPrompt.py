@@ -4,7 +4,7 @@ from tkinter import ttk, messagebox, filedialog
 from PIL import Image, ImageTk
 import threading
 
-from clustering.Kmeans import Kmeans
+from clustering.Kmeans import Kmeans, INIT_METHODS, ALGORITHMS
 from visualizer.ScatterPlot import ScatterPlot
 from gui.InputPrompt import InputPrompt
 
@@ -76,6 +76,16 @@ class KmeansPrompt(tk.Toplevel):
         self.cluster_entry.insert(0, "1")
         self.cluster_entry.pack(pady=5)
 
+        ttk.Label(self.controls_frame, text="Centroid Initialization:").pack(pady=5)
+        self.init_method = tk.StringVar(value="k-means++")
+        ttk.Combobox(self.controls_frame, textvariable=self.init_method, values=INIT_METHODS,
+                     state='readonly').pack(pady=5)
+
+        ttk.Label(self.controls_frame, text="Iteration Algorithm:").pack(pady=5)
+        self.algorithm = tk.StringVar(value="lloyd")
+        ttk.Combobox(self.controls_frame, textvariable=self.algorithm, values=ALGORITHMS,
+                     state='readonly').pack(pady=5)
+
         self.run_button = ttk.Button(self.controls_frame, text="Run Clustering", command=self.run_clustering)
         self.run_button.pack(pady=15)
 
@@ -86,6 +96,9 @@ class KmeansPrompt(tk.Toplevel):
         self.loader.pack(pady=10)
         self.loader.pack_forget()
 
+        self.iterations_label = ttk.Label(self.controls_frame, text="")
+        self.iterations_label.pack(pady=5)
+
     def run_clustering(self):
         try:
             value = int(self.cluster_entry.get())
@@ -101,8 +114,9 @@ class KmeansPrompt(tk.Toplevel):
 
     def _process_clustering(self, value):
         try:
-            k = Kmeans(self.data, value)
+            k = Kmeans(self.data, value, init=self.init_method.get(), algorithm=self.algorithm.get())
             clusters = k.kmeans()
+            self.iterations_label.config(text=f"Stopped after {k.n_iter} iterations ({k.stop_reason})")
             plot = ScatterPlot(clusters)
             plot.show()
         except Exception as e:
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 import pandas as pd
 
 class Utils:
@@ -61,6 +62,29 @@ class Utils:
         # print(data) #test
         return data
 
+    @staticmethod
+    def iter_numeric_batches(csvFilePath, chunksize=100_000):
+        # float arrays of chunksize rows with the same encoding as prepare_data_for_clustering, for
+        # MiniBatchKmeans.partial_fit; pass 1 collects the column types and categories so every chunk gets the
+        # same one-hot columns, pass 2 encodes one chunk at a time
+        kinds, categories = {}, {}
+        for chunk in pd.read_csv(csvFilePath, chunksize=chunksize):
+            for col in chunk.columns:
+                kinds.setdefault(col, set()).add(Utils._column_kind(chunk[col]))
+        numeric_cols = [col for col, seen in kinds.items() if seen <= {"numeric", "bool"}]
+        string_cols = {col: str for col in kinds if col not in numeric_cols}
+        if string_cols:
+            for chunk in pd.read_csv(csvFilePath, chunksize=chunksize, usecols=list(string_cols),
+                                     dtype=string_cols):
+                for col in string_cols:
+                    categories.setdefault(col, set()).update(chunk[col].fillna("0").unique())
+
+        for chunk in pd.read_csv(csvFilePath, chunksize=chunksize, dtype=string_cols):
+            chunk = chunk.fillna({col: 0 for col in numeric_cols} | {col: "0" for col in string_cols})
+            for col in string_cols:
+                chunk[col] = pd.Categorical(chunk[col], categories=sorted(categories[col]))
+            yield pd.get_dummies(chunk, drop_first=True, dtype=int).to_numpy(dtype=np.float64)
+
 
 
     # ========== ASSOCIATION UTILS ==========
@@ -70,15 +94,38 @@ class Utils:
         for col in df.columns:
             if pd.api.types.is_numeric_dtype(df[col]):
                 try:
-                    if labels is None:
-                        label_set = ['low', 'medium', 'high'] if bins == 3 else [f"bin{i + 1}" for i in range(bins)]
-                    else:
-                        label_set = labels
-                    df[col] = pd.cut(df[col], bins=bins, labels=label_set)
+                    df[col] = pd.cut(df[col], bins=bins, labels=Utils._bin_labels(bins, labels))
                 except Exception as e:
                     print(f"Warning: Could not discretize column '{col}' — {e}")
         return df
 
+    @staticmethod
+    def _bin_labels(bins, labels=None):
+        if labels is not None:
+            return labels
+        return ['low', 'medium', 'high'] if bins == 3 else [f"bin{i + 1}" for i in range(bins)]
+
+    @staticmethod
+    def _cut_edges(mn, mx, bins):
+        # the edges pd.cut(series, bins=<int>) derives from the column's min and max
+        if mn == mx:
+            mn -= 0.001 * abs(mn) if mn != 0 else 0.001
+            mx += 0.001 * abs(mx) if mx != 0 else 0.001
+            return np.linspace(mn, mx, bins + 1)
+        edges = np.linspace(mn, mx, bins + 1)
+        edges[0] -= (mx - mn) * 0.001
+        return edges
+
+    @staticmethod
+    def _column_kind(series):
+        if pd.api.types.is_bool_dtype(series):
+            return "bool"
+        if pd.api.types.is_numeric_dtype(series):
+            return "numeric"
+        if pd.api.types.is_string_dtype(series):
+            return "string"
+        return "other"
+
     @staticmethod
     def getDataType(csvFilePath):
         df = pd.read_csv(csvFilePath)
@@ -95,6 +142,10 @@ class Utils:
             else:
                 other_cols += 1
 
+        return Utils._dataset_type_info(total_cols, numeric_cols, categorical_cols, other_cols)
+
+    @staticmethod
+    def _dataset_type_info(total_cols, numeric_cols, categorical_cols, other_cols):
         numeric_ratio = numeric_cols / total_cols
         categorical_ratio = categorical_cols / total_cols
         others_ratio = other_cols / total_cols
@@ -134,3 +185,56 @@ class Utils:
                 transactions.append(Transaction(tid=i + 1, items=items))
 
         return transactions
+
+    @staticmethod
+    def parse_transaction_store(df):
+        # same items as parse_transactions(df, source_type='csv'), built column-wise without iterrows
+        from association.TransactionStore import TransactionStore
+        return TransactionStore.from_dataframe(df)
+
+    @staticmethod
+    def stream_transaction_store(csvFilePath, chunksize=100_000, bins=3, labels=None):
+        # same transactions as read_csv + getDataType + discretize_numeric_columns + parse_transaction_store,
+        # but the file is read twice in chunks and never held in memory as a whole:
+        # pass 1 infers column types and numeric ranges, pass 2 discretizes each chunk and encodes it
+        from association.TransactionStore import TransactionStore
+
+        kinds = {}  # column -> kinds seen across chunks
+        ranges = {}  # column -> (min, max) of its non-null values
+        for chunk in pd.read_csv(csvFilePath, chunksize=chunksize):
+            for col in chunk.columns:
+                kinds.setdefault(col, set()).add(Utils._column_kind(chunk[col]))
+                if pd.api.types.is_numeric_dtype(chunk[col]) and chunk[col].notna().any():
+                    mn, mx = float(chunk[col].min()), float(chunk[col].max())
+                    if col in ranges:
+                        mn, mx = min(mn, ranges[col][0]), max(mx, ranges[col][1])
+                    ranges[col] = (mn, mx)
+
+        # resolve each column the way a single read of the whole file would type it
+        column_kinds = {}
+        for col, seen in kinds.items():
+            if len(seen) == 1:
+                column_kinds[col] = seen.pop()
+            elif "other" in seen and "string" not in seen:
+                column_kinds[col] = "other"
+            else:
+                column_kinds[col] = "string"  # mixed chunks end up as object columns
+
+        kind_list = list(column_kinds.values())
+        dtype_info = Utils._dataset_type_info(len(kind_list), kind_list.count("numeric"),
+                                              kind_list.count("string") + kind_list.count("bool"),
+                                              kind_list.count("other"))
+
+        edges = {}
+        if dtype_info["categorical_ratio"] != 1.0:
+            edges = {col: Utils._cut_edges(*ranges[col], bins) for col, kind in column_kinds.items()
+                     if kind in ("numeric", "bool") and col in ranges}
+        label_set = Utils._bin_labels(bins, labels)
+        string_cols = {col: str for col, kind in column_kinds.items() if kind == "string"}
+
+        store = TransactionStore()
+        for chunk in pd.read_csv(csvFilePath, chunksize=chunksize, dtype=string_cols):
+            for col, col_edges in edges.items():
+                chunk[col] = pd.cut(chunk[col], bins=col_edges, labels=label_set)
+            store.extend_dataframe(chunk)
+        return store
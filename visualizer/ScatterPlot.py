@@ -9,7 +9,7 @@ from sklearn.decomposition import PCA
 class ScatterPlot:
     def __init__(self, clusters):
         self.clusters = clusters
-        self.dimensionality = len(clusters[0]['data'][0])
+        self.dimensionality = len(clusters[0]['centroid'])  # a cluster can end up empty, its centroid cannot
 
     def show(self):
         window = tk.Toplevel()